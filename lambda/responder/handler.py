@@ -12,21 +12,100 @@ This is constrained auto-response:
 """
 
 import json
-import boto3
+import logging
+import functools
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Any
-
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-sns = boto3.client('sns')
-cloudwatch = boto3.client('cloudwatch')
+from typing import Dict, Any, Optional
 
 # Environment variables
 import os
 TABLE_NAME = os.environ.get('INCIDENTS_TABLE', 'mfa-incidents')
 SNS_TOPIC_ARN = os.environ.get('SNS_TOPIC_ARN', '')
-ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+try:
+    from build_config import ENVIRONMENT, LOG_LEVEL  # Written into the zip by Terraform
+except ImportError:
+    ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+# Lambda's runtime attaches its handler to the root logger; LOG_LEVEL (WARNING
+# in prod, see terraform/main.tf) keeps per-step INFO lines out of CloudWatch Logs
+logger = logging.getLogger()
+
+
+def resolve_log_level(name: str) -> int:
+    """
+    Map a LOG_LEVEL name to a logging level, case-insensitively.
+    
+    Unrecognised names fall back to INFO: logger.setLevel raises on them,
+    which would fail every cold start with an init error.
+    """
+    level = logging.getLevelName(str(name).upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+logger.setLevel(resolve_log_level(LOG_LEVEL))
+
+# Sparse GSI keyed on gsi_pk (HASH) + remediation_ready_at (RANGE), see
+# terraform/dynamodb.tf. Only OPEN rate_limiting incidents carry gsi_pk.
+ELIGIBILITY_INDEX = 'remediation-ready-index'
+REMEDIATION_GSI_PK = 'OPEN_RATE'
+
+# TransactWriteItems accepts at most 100 actions per request
+TRANSACT_MAX_ITEMS = 100
+# SNS PublishBatch accepts at most 10 entries per request
+SNS_BATCH_MAX_ENTRIES = 10
+# CloudWatch metrics are emitted as Embedded Metric Format (EMF) log lines.
+# EMF allows at most 100 values per metric in one log event.
+METRIC_NAMESPACE = 'MFAIncidentSimulator'
+RESOLUTION_METRIC_DIMENSIONS = [['Scenario', 'Environment'], ['Environment']]
+EMF_MAX_VALUES = 100
+# Worker threads for concurrent AWS calls (kept below max_pool_connections)
+MAX_WORKERS = 16
+# Up to this many resolutions fit one TransactWriteItems and one PublishBatch
+# request, so they are processed inline without building a thread pool
+INLINE_REMEDIATIONS_MAX = SNS_BATCH_MAX_ENTRIES
+RESOLUTION_NOTES = 'Cooldown period completed. Rate limiting cleared. User may attempt re-authentication.'
+
+# incident_id -> resolved_at for incidents this container already resolved.
+# The GSI is eventually consistent, so a just-resolved incident can come back
+# in the next scheduled query; warm invocations skip it instead of re-notifying.
+RECENT_RESOLVED: 'OrderedDict[str, str]' = OrderedDict()
+RECENT_RESOLVED_MAX = 1000
+
+
+# AWS clients are created on first use (boto3 import dominates cold start)
+# and cached at module scope so warm invocations reuse their connections.
+@functools.lru_cache(maxsize=1)
+def get_client_config():
+    """Shared client config: keep-alive pool and adaptive retries."""
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=50,
+        tcp_keepalive=True,
+        retries={'mode': 'adaptive', 'max_attempts': 3}
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_table():
+    """DynamoDB incidents table handle."""
+    import boto3
+    return boto3.resource('dynamodb', config=get_client_config()).Table(TABLE_NAME)
+
+
+@functools.lru_cache(maxsize=1)
+def get_sns():
+    """SNS client for incident notifications."""
+    import boto3
+    return boto3.client('sns', config=get_client_config())
+
+
+# SNS message bodies are indented for email readability. json.dumps(indent=2)
+# builds a new encoder per call; reuse one instead
+MESSAGE_ENCODER = json.JSONEncoder(indent=2)
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -39,25 +118,33 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     
     Only processes rate_limiting incidents that have exceeded cooldown.
     """
-    print(f"[INFO] Responder triggered at {datetime.now(timezone.utc).isoformat()}")
+    # Single clock read per invocation, shared by eligibility and resolution
+    now = int(time.time())
+    now_iso = datetime.fromtimestamp(now, tz=timezone.utc).isoformat()
+    
+    logger.info(f"Responder triggered at {now_iso}")
     
     # Get incidents eligible for remediation
-    eligible_incidents = get_eligible_incidents()
+    eligible_incidents = get_eligible_incidents(now)
     
     if not eligible_incidents:
-        print("[INFO] No incidents eligible for remediation")
+        logger.info("No incidents eligible for remediation")
         return {
             'statusCode': 200,
             'body': json.dumps({'processed': 0, 'message': 'No eligible incidents'})
         }
     
-    processed = 0
-    for incident in eligible_incidents:
-        try:
-            process_remediation(incident)
-            processed += 1
-        except Exception as e:
-            print(f"[ERROR] Failed to process {incident['incident_id']}: {str(e)}")
+    resolved = process_remediations(eligible_incidents, now, now_iso)
+    processed = len(resolved)
+    
+    # One summary line per run instead of per-incident log lines, built only
+    # when INFO is enabled (prod logs at WARNING)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({
+            'processed': processed,
+            'total_eligible': len(eligible_incidents),
+            'incident_ids': [incident['incident_id'] for incident, _ in resolved]
+        }))
     
     return {
         'statusCode': 200,
@@ -68,200 +155,297 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     }
 
 
-def get_eligible_incidents() -> list:
+def get_eligible_incidents(current_time: int) -> list:
     """
     Query DynamoDB for rate_limiting incidents past cooldown period.
     
     Eligibility criteria:
-    - scenario = 'rate_limiting'
     - status = 'OPEN'
+    - scenario = 'rate_limiting'
     - created_at + cooldown_seconds < current_time
+    
+    The simulator stores created_at + cooldown_seconds as remediation_ready_at
+    and only OPEN rate_limiting incidents are in the sparse
+    remediation-ready-index, so the key condition alone selects them.
     """
+    from boto3.dynamodb.conditions import Key
+    
     try:
-        table = dynamodb.Table(TABLE_NAME)
-        current_time = int(time.time())
-        
-        # Scan for open rate_limiting incidents
-        # In production, use a GSI for efficiency
-        response = table.scan(
-            FilterExpression='scenario = :scenario AND #status = :status',
-            ExpressionAttributeNames={'#status': 'status'},
-            ExpressionAttributeValues={
-                ':scenario': 'rate_limiting',
-                ':status': 'OPEN'
-            }
-        )
+        query_kwargs = {
+            'IndexName': ELIGIBILITY_INDEX,
+            'KeyConditionExpression': (
+                Key('gsi_pk').eq(REMEDIATION_GSI_PK) & Key('remediation_ready_at').lt(current_time)
+            ),
+            # Skip detection_signal/description/metadata blobs: only the
+            # notification and metric fields are read back
+            'ProjectionExpression': 'incident_id, created_at, #u, severity, scenario',
+            'ExpressionAttributeNames': {'#u': 'user'}
+        }
         
         eligible = []
-        for item in response.get('Items', []):
-            created_at = item.get('created_at', 0)
-            cooldown = item.get('cooldown_seconds', 300)
+        while True:
+            response = get_table().query(**query_kwargs)
+            eligible.extend(response.get('Items', []))
             
-            if current_time > (created_at + cooldown):
-                eligible.append(item)
-                print(f"[INFO] Incident {item['incident_id']} eligible for remediation")
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key:
+                break
+            query_kwargs['ExclusiveStartKey'] = last_evaluated_key
         
         return eligible
         
     except Exception as e:
-        print(f"[ERROR] Failed to query incidents: {str(e)}")
+        logger.error(f"Failed to query incidents: {str(e)}")
         return []
 
 
-def process_remediation(incident: Dict[str, Any]) -> None:
+def process_remediations(incidents: list, now: int, now_iso: str) -> list:
     """
-    Process assisted remediation for a single incident.
+    Process assisted remediation for a batch of incidents.
     
     Actions:
-    1. Update incident status to RESOLVED
-    2. Record resolution timestamp
-    3. Calculate resolution time (simulated MTTR)
-    4. Send SNS notification
-    5. Emit CloudWatch metric
+    1. Calculate resolution time (simulated MTTR) for each incident
+    2. Update incident status to RESOLVED (batched transactional writes)
+    3. Record resolution timestamp
+    4. Send SNS notifications (batched)
+    5. Emit CloudWatch metrics (EMF log lines, no API call)
+    
+    DynamoDB chunks are written concurrently; once they commit, the SNS and
+    CloudWatch calls are independent and are fanned out on the same pool.
+    The usual scheduled run has only a few due incidents; up to
+    INLINE_REMEDIATIONS_MAX are processed inline, one request per call.
+    Incidents this warm container already resolved (RECENT_RESOLVED) are
+    skipped.
     
     Does NOT:
     - Modify IAM users or policies
     - Unlock accounts
     - Make any destructive changes
+    
+    Returns the (incident, resolution_time_seconds) tuples that were resolved.
     """
-    incident_id = incident['incident_id']
-    print(f"[INFO] Processing remediation for {incident_id}")
-    
-    # Calculate resolution time
-    created_at = incident.get('created_at', int(time.time()))
-    resolved_at = int(time.time())
-    resolution_time_seconds = resolved_at - created_at
-    
-    # Update incident in DynamoDB
-    update_incident_status(
-        incident_id=incident_id,
-        new_status='RESOLVED',
-        resolution_time=resolution_time_seconds,
-        resolution_notes='Cooldown period completed. Rate limiting cleared. User may attempt re-authentication.'
-    )
+    resolutions = [
+        (incident, now - int(incident.get('created_at', now)))
+        for incident in incidents
+        if incident['incident_id'] not in RECENT_RESOLVED
+    ]
     
-    # Send resolution notification
-    send_resolution_notification(incident, resolution_time_seconds)
+    if len(resolutions) <= INLINE_REMEDIATIONS_MAX:
+        # One request per call: a thread pool would only add setup cost
+        resolved = update_incidents_batch(resolutions, 'RESOLVED', now_iso)
+        emit_resolution_metrics(resolved)
+        send_resolution_notifications_batch(resolved, now_iso)
+    else:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            # Update incidents in DynamoDB; only committed chunks are notified
+            resolved = update_incidents_batch(resolutions, 'RESOLVED', now_iso, executor=executor)
+            
+            # Emit resolution metrics while notifications are published
+            metrics_future = executor.submit(emit_resolution_metrics, resolved)
+            
+            # Send resolution notifications
+            send_resolution_notifications_batch(resolved, now_iso, executor=executor)
+            
+            metrics_future.result()
     
-    # Emit resolution metric
-    emit_resolution_metric(incident, resolution_time_seconds)
+    remember_resolved(resolved, now_iso)
+    return resolved
+
+
+def remember_resolved(resolutions: list, resolved_at: str) -> None:
+    """Record resolved incident IDs, evicting the oldest past RECENT_RESOLVED_MAX."""
+    for incident, _ in resolutions:
+        RECENT_RESOLVED[incident['incident_id']] = resolved_at
+        RECENT_RESOLVED.move_to_end(incident['incident_id'])
     
-    print(f"[INFO] Remediation complete for {incident_id} (resolution time: {resolution_time_seconds}s)")
+    while len(RECENT_RESOLVED) > RECENT_RESOLVED_MAX:
+        RECENT_RESOLVED.popitem(last=False)
+
+
+def chunked(items: list, size: int) -> list:
+    """Split a list into consecutive chunks of at most `size` items."""
+    return [items[start:start + size] for start in range(0, len(items), size)]
 
 
-def update_incident_status(
-    incident_id: str,
+def update_incidents_batch(
+    resolutions: list,
     new_status: str,
-    resolution_time: int,
-    resolution_notes: str
-) -> None:
-    """Update incident status in DynamoDB."""
+    resolved_at: str,
+    executor: Optional[ThreadPoolExecutor] = None
+) -> list:
+    """
+    Update incident status in DynamoDB using TransactWriteItems.
+    
+    `resolutions` is a list of (incident, resolution_time_seconds) tuples,
+    written in chunks of up to 100 updates per request (concurrently when an
+    executor is given). A failed chunk is logged and left OPEN for the next
+    scheduled run.
+    
+    Returns the resolutions whose chunk was committed.
+    """
+    chunks = chunked(resolutions, TRANSACT_MAX_ITEMS)
+    mapper = executor.map if executor else map
+    
+    committed = []
+    for chunk_result in mapper(lambda chunk: update_incidents_chunk(chunk, new_status, resolved_at), chunks):
+        committed.extend(chunk_result)
+    
+    return committed
+
+
+def update_incidents_chunk(chunk: list, new_status: str, resolved_at: str) -> list:
+    """Write one TransactWriteItems request. Returns the chunk, or [] on failure."""
     try:
-        table = dynamodb.Table(TABLE_NAME)
-        
-        table.update_item(
-            Key={'incident_id': incident_id},
-            UpdateExpression='''
-                SET #status = :status,
-                    resolved_at = :resolved_at,
-                    resolution_time_seconds = :resolution_time,
-                    resolution_notes = :notes,
-                    remediation_type = :remediation_type
-            ''',
-            ExpressionAttributeNames={'#status': 'status'},
-            ExpressionAttributeValues={
-                ':status': new_status,
-                ':resolved_at': datetime.now(timezone.utc).isoformat(),
-                ':resolution_time': resolution_time,
-                ':notes': resolution_notes,
-                ':remediation_type': 'assisted_auto'
-            }
+        get_table().meta.client.transact_write_items(
+            TransactItems=[
+                {
+                    'Update': {
+                        'TableName': TABLE_NAME,
+                        'Key': {'incident_id': incident['incident_id']},
+                        'UpdateExpression': (
+                            'SET #status = :status, '
+                            'resolved_at = :resolved_at, '
+                            'resolution_time_seconds = :resolution_time, '
+                            'resolution_notes = :notes, '
+                            'remediation_type = :remediation_type '
+                            'REMOVE gsi_pk'
+                        ),
+                        'ExpressionAttributeNames': {'#status': 'status'},
+                        'ExpressionAttributeValues': {
+                            ':status': new_status,
+                            ':resolved_at': resolved_at,
+                            ':resolution_time': resolution_time,
+                            ':notes': RESOLUTION_NOTES,
+                            ':remediation_type': 'assisted_auto'
+                        }
+                    }
+                }
+                for incident, resolution_time in chunk
+            ]
         )
-        
-        print(f"[INFO] Updated incident {incident_id} to {new_status}")
+        return chunk
         
     except Exception as e:
-        print(f"[ERROR] Failed to update incident: {str(e)}")
-        raise
+        ids = ', '.join(incident['incident_id'] for incident, _ in chunk)
+        logger.error(f"Failed to update incidents [{ids}]: {str(e)}")
+        return []
 
 
-def send_resolution_notification(incident: Dict[str, Any], resolution_time: int) -> None:
-    """Send SNS notification for resolved incident."""
+def send_resolution_notifications_batch(
+    resolutions: list,
+    timestamp: str,
+    executor: Optional[ThreadPoolExecutor] = None
+) -> None:
+    """
+    Send SNS notifications for resolved incidents using PublishBatch.
+    
+    `resolutions` is a list of (incident, resolution_time_seconds) tuples,
+    published in chunks of up to 10 entries per request (concurrently when an
+    executor is given). Failed entries are reported individually in the
+    response and logged.
+    """
     if not SNS_TOPIC_ARN:
-        print("[WARN] SNS_TOPIC_ARN not configured, skipping notification")
+        logger.warning("SNS_TOPIC_ARN not configured, skipping notification")
         return
     
+    # Build the client before fanning out; boto3 sessions are not thread-safe
+    get_sns()
+    
+    chunks = chunked(resolutions, SNS_BATCH_MAX_ENTRIES)
+    mapper = executor.map if executor else map
+    list(mapper(lambda chunk: send_resolution_notifications_chunk(chunk, timestamp), chunks))
+
+
+def send_resolution_notifications_chunk(chunk: list, timestamp: str) -> None:
+    """Publish one PublishBatch request of up to 10 resolution notifications."""
     try:
-        message = {
-            'event': 'INCIDENT_RESOLVED',
-            'incident_id': incident['incident_id'],
-            'scenario': incident['scenario'],
-            'user': incident['user'],
-            'original_severity': incident['severity'],
-            'resolution_time_seconds': resolution_time,
-            'resolution_time_formatted': format_duration(resolution_time),
-            'remediation_type': 'assisted',
-            'notes': 'Cooldown period completed. Rate limiting cleared.',
-            'timestamp': datetime.now(timezone.utc).isoformat()
-        }
+        entries = []
+        for incident, resolution_time in chunk:
+            message = {
+                'event': 'INCIDENT_RESOLVED',
+                'incident_id': incident['incident_id'],
+                'scenario': incident['scenario'],
+                'user': incident['user'],
+                'original_severity': incident['severity'],
+                'resolution_time_seconds': resolution_time,
+                'resolution_time_formatted': format_duration(resolution_time),
+                'remediation_type': 'assisted',
+                'notes': 'Cooldown period completed. Rate limiting cleared.',
+                'timestamp': timestamp
+            }
+            entries.append({
+                'Id': incident['incident_id'],
+                'Subject': f"[RESOLVED] MFA Incident: {incident['incident_id']}",
+                'Message': MESSAGE_ENCODER.encode(message)
+            })
         
-        sns.publish(
+        response = get_sns().publish_batch(
             TopicArn=SNS_TOPIC_ARN,
-            Subject=f"[RESOLVED] MFA Incident: {incident['incident_id']}",
-            Message=json.dumps(message, indent=2)
+            PublishBatchRequestEntries=entries
         )
         
-        print(f"[INFO] Sent resolution notification for {incident['incident_id']}")
+        for failure in response.get('Failed', []):
+            logger.error(f"Failed to send notification for {failure['Id']}: {failure.get('Code')} {failure.get('Message', '')}")
         
     except Exception as e:
-        print(f"[ERROR] Failed to send notification: {str(e)}")
+        logger.error(f"Failed to send notifications: {str(e)}")
 
 
-def emit_resolution_metric(incident: Dict[str, Any], resolution_time: int) -> None:
-    """Emit CloudWatch metrics for resolution."""
-    try:
-        cloudwatch.put_metric_data(
-            Namespace='MFAIncidentSimulator',
-            MetricData=[
-                {
-                    'MetricName': 'IncidentResolved',
-                    'Dimensions': [
-                        {'Name': 'Scenario', 'Value': incident['scenario']},
-                        {'Name': 'Environment', 'Value': ENVIRONMENT}
-                    ],
-                    'Value': 1,
-                    'Unit': 'Count'
-                },
-                {
-                    'MetricName': 'ResolutionTimeSeconds',
-                    'Dimensions': [
-                        {'Name': 'Scenario', 'Value': incident['scenario']},
-                        {'Name': 'Environment', 'Value': ENVIRONMENT}
-                    ],
-                    'Value': resolution_time,
-                    'Unit': 'Seconds'
-                }
-            ]
-        )
-        
-        print(f"[INFO] Emitted resolution metrics for {incident['incident_id']}")
-        
-    except Exception as e:
-        print(f"[ERROR] Failed to emit metrics: {str(e)}")
+def emit_resolution_metrics(resolutions: list) -> None:
+    """
+    Emit CloudWatch metrics for resolutions using Embedded Metric Format.
+    
+    `resolutions` is a list of (incident, resolution_time_seconds) tuples.
+    One log line is written per scenario (split past 100 values), and
+    CloudWatch Logs extracts the metrics without a PutMetricData request.
+    """
+    by_scenario = {}
+    for incident, resolution_time in resolutions:
+        by_scenario.setdefault(incident['scenario'], []).append(resolution_time)
+    
+    for scenario, resolution_times in by_scenario.items():
+        for chunk in chunked(resolution_times, EMF_MAX_VALUES):
+            try:
+                # Plain print: EMF must be the raw log line, without logger prefixes
+                print(json.dumps({
+                    '_aws': {
+                        'Timestamp': int(time.time() * 1000),
+                        'CloudWatchMetrics': [
+                            {
+                                'Namespace': METRIC_NAMESPACE,
+                                'Dimensions': RESOLUTION_METRIC_DIMENSIONS,
+                                'Metrics': [
+                                    {'Name': 'IncidentResolved', 'Unit': 'Count'},
+                                    {'Name': 'ResolutionTimeSeconds', 'Unit': 'Seconds'}
+                                ]
+                            }
+                        ]
+                    },
+                    'Scenario': scenario,
+                    'Environment': ENVIRONMENT,
+                    'IncidentResolved': len(chunk),
+                    'ResolutionTimeSeconds': chunk
+                }))
+            except Exception as e:
+                logger.error(f"Failed to emit metrics: {str(e)}")
 
 
+@functools.lru_cache(maxsize=1024)
 def format_duration(seconds: int) -> str:
-    """Format seconds as human-readable duration."""
-    if seconds < 60:
+    """
+    Format seconds as human-readable duration.
+    
+    Cached: resolution times cluster just past the 300s cooldown, so the
+    same few strings are formatted over and over.
+    """
+    minutes, secs = divmod(seconds, 60)
+    if minutes <= 0:
         return f"{seconds}s"
-    elif seconds < 3600:
-        minutes = seconds // 60
-        secs = seconds % 60
-        return f"{minutes}m {secs}s"
-    else:
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
+    
+    hours, minutes = divmod(minutes, 60)
+    if hours:
         return f"{hours}h {minutes}m"
+    return f"{minutes}m {secs}s"
 
 
 # For local testing
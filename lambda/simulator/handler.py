@@ -4,6 +4,7 @@ MFA Incident Simulator & Detector
 Dual-mode Lambda function:
 1. SIMULATOR MODE: Generates synthetic incidents for testing (manual CLI invoke)
 2. DETECTOR MODE: Processes real CloudTrail events from EventBridge
+   (one per invocation, or batched through SQS)
 
 Scenarios:
 - MFA authentication failure (consistent with token expiration)
@@ -11,23 +12,129 @@ Scenarios:
 - Policy mismatch (MFA present but action denied)
 """
 
+import copy
 import json
-import boto3
-import uuid
+import logging
+import functools
+import hashlib
 import time
+from os import urandom
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from decimal import Decimal
 from typing import Dict, Any, Optional
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-sns = boto3.client('sns')
-cloudwatch = boto3.client('cloudwatch')
-
 # Environment variables (set via Terraform)
 import os
 TABLE_NAME = os.environ.get('INCIDENTS_TABLE', 'mfa-incidents')
 SNS_TOPIC_ARN = os.environ.get('SNS_TOPIC_ARN', '')
-ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+try:
+    from build_config import ENVIRONMENT, LOG_LEVEL  # Written into the zip by Terraform
+except ImportError:
+    ENVIRONMENT = os.environ.get('ENVIRONMENT', 'dev')
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+# Lambda's runtime attaches its handler to the root logger; LOG_LEVEL (WARNING
+# in prod, see terraform/main.tf) keeps per-step INFO lines out of CloudWatch Logs
+logger = logging.getLogger()
+
+
+def resolve_log_level(name: str) -> int:
+    """
+    Map a LOG_LEVEL name to a logging level, case-insensitively.
+    
+    Unrecognised names fall back to INFO: logger.setLevel raises on them,
+    which would fail every cold start with an init error.
+    """
+    level = logging.getLevelName(str(name).upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+logger.setLevel(resolve_log_level(LOG_LEVEL))
+
+# BatchWriteItem accepts at most 25 put requests per call
+DYNAMODB_BATCH_MAX_ITEMS = 25
+BATCH_WRITE_MAX_ATTEMPTS = 5
+BATCH_WRITE_BASE_DELAY_SECONDS = 0.05
+# SNS PublishBatch accepts at most 10 entries per request
+SNS_BATCH_MAX_ENTRIES = 10
+# Severities alerted one message per incident; the rest of a multi-incident
+# batch goes out as digests (capped to stay well under SNS's 256 KB limit)
+IMMEDIATE_ALERT_SEVERITIES = frozenset({'HIGH'})
+ALERT_DIGEST_MAX_INCIDENTS = 200
+# Worker threads for concurrent AWS calls (kept below max_pool_connections)
+MAX_WORKERS = 16
+
+# DynamoDB TTL: incidents expire 7 days after creation
+INCIDENT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Crockford base32 alphabet used for ULID-style incident IDs
+ULID_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+# Bit offsets of the 26 five-bit groups, most significant first
+ULID_SHIFTS = tuple(range(125, -5, -5))
+# Last ULID minted by this container, so IDs from one millisecond stay ordered
+# (IDs are only minted on the invocation thread, never in the worker pools)
+LAST_ULID_VALUE = 0
+
+# Partition value of the responder's sparse remediation-ready-index
+REMEDIATION_GSI_PK = 'OPEN_RATE'
+
+# CloudTrail sub-documents are copied into detection_signal as bounded
+# summaries to keep stored items small
+MFA_EVENT_DATA_KEYS = ('MFAUsed', 'MFAIdentifier', 'LoginTo', 'MobileVersion')
+EVENT_DATA_MAX_CHARS = 256
+
+# CloudTrail errorCodes that indicate a possible MFA policy mismatch
+ACCESS_DENIED_CODES = frozenset({'AccessDenied', 'UnauthorizedAccess'})
+
+# Scheduled keep-warm invocations (see terraform/lambda.tf)
+WARMUP_SCENARIO = 'ping'
+
+# CloudWatch metrics are emitted as Embedded Metric Format (EMF) log lines.
+# Each dimension set matches a dashboard widget or alarm query.
+METRIC_NAMESPACE = 'MFAIncidentSimulator'
+INCIDENT_METRIC_DIMENSIONS = [
+    ['Scenario', 'Severity', 'Environment', 'Source'],
+    ['Scenario', 'Environment'],
+    ['Severity', 'Environment'],
+    ['Environment']
+]
+
+
+# AWS clients are created on first use (boto3 import dominates cold start)
+# and cached at module scope so warm invocations reuse their connections.
+@functools.lru_cache(maxsize=1)
+def get_client_config():
+    """Shared client config: keep-alive pool and adaptive retries."""
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=50,
+        tcp_keepalive=True,
+        retries={'mode': 'adaptive', 'max_attempts': 3}
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_dynamodb():
+    """Low-level DynamoDB client; items are serialized by to_dynamodb."""
+    import boto3
+    return boto3.client('dynamodb', config=get_client_config())
+
+
+@functools.lru_cache(maxsize=1)
+def get_sns():
+    """SNS client for incident notifications."""
+    import boto3
+    return boto3.client('sns', config=get_client_config())
+
+
+# SNS message bodies are indented for email readability. json.dumps(indent=2)
+# builds a new encoder per call; reuse one instead
+MESSAGE_ENCODER = json.JSONEncoder(indent=2)
+
+
+# Fully static response bodies are encoded once at import
+WARMUP_BODY = json.dumps({'mode': 'warmup', 'status': 'warm'})
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -46,76 +153,82 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         "detail-type": "AWS Console Sign In via CloudTrail",
         "detail": { ... CloudTrail event ... }
     }
+    
+    Batched Detector Mode (SQS event source mapping):
+    {
+        "Records": [{"body": "<EventBridge CloudTrail event JSON>", ...}]
+    }
+    
+    Warmup Mode (EventBridge schedule):
+    {
+        "scenario": "ping"
+    }
     """
     
+    # Keep-warm pings return before any DynamoDB/SNS client is created
+    if event.get('scenario') == WARMUP_SCENARIO:
+        return {
+            'statusCode': 200,
+            'body': WARMUP_BODY
+        }
+    
+    # Single clock read per invocation, shared by every timestamp in the incident
+    now = int(time.time())
+    now_iso = datetime.fromtimestamp(now, tz=timezone.utc).isoformat()
+    
     # Determine mode based on event structure
+    records = event.get('Records')
+    if records is not None:
+        return process_event_batch(records, now, now_iso)
+    
     if is_cloudtrail_event(event):
-        return process_cloudtrail_event(event)
-    else:
-        return process_simulator_event(event)
+        return process_cloudtrail_event(event, now, now_iso)
+    
+    return process_simulator_event(event, now, now_iso)
 
 
-def is_cloudtrail_event(event: Dict[str, Any]) -> bool:
-    """Check if this is a real CloudTrail event from EventBridge."""
-    return (
-        'detail-type' in event and 
-        'detail' in event and
-        isinstance(event.get('detail'), dict)
-    )
+def is_cloudtrail_event(event: Dict[str, Any], _dict: type = dict) -> bool:
+    """
+    Check if this is a real CloudTrail event from EventBridge.
+    
+    Runs on every invocation: one lookup for `detail` and an exact type
+    check (JSON-decoded events are plain dicts, so no isinstance MRO walk).
+    `_dict` is bound as a default so the check is a local, not global, load.
+    """
+    return event.get('detail').__class__ is _dict and 'detail-type' in event
 
 
-def process_cloudtrail_event(event: Dict[str, Any]) -> Dict[str, Any]:
+def detect_cloudtrail_incident(event: Dict[str, Any], now: int, now_iso: str) -> tuple:
     """
-    Process real CloudTrail events from EventBridge.
+    Match a CloudTrail event against the incident patterns.
     
-    Detects:
-    - ConsoleLogin failures (MFA auth failure pattern)
-    - ConsoleLogin success without MFA (MFA not enforced)
-    - AccessDenied errors (policy mismatch pattern)
+    Returns (incident or None, event_name); nothing is stored or published.
     """
-    detail_type = event.get('detail-type', '')
-    detail = event.get('detail', {})
+    detail = event['detail']  # Guaranteed a dict by is_cloudtrail_event
     
-    print(f"[INFO] Processing CloudTrail event: {detail_type}")
+    # Extract common fields in one pass with a bound get (itemgetter would
+    # raise on the optional keys)
+    get = detail.get
+    event_name = get('eventName', '')
+    error_code = get('errorCode', '')
+    user_identity = get('userIdentity', {})
+    source_ip = get('sourceIPAddress', 'unknown')
     
-    # Extract common fields
-    event_name = detail.get('eventName', '')
-    error_code = detail.get('errorCode', '')
-    error_message = detail.get('errorMessage', '')
-    user_identity = detail.get('userIdentity', {})
-    username = user_identity.get('userName', user_identity.get('principalId', 'unknown'))
-    source_ip = detail.get('sourceIPAddress', 'unknown')
+    # principalId is only looked up when userName is absent
+    if 'userName' in user_identity:
+        username = user_identity['userName']
+    else:
+        username = user_identity.get('principalId', 'unknown')
     
     incident = None
     
-    # Pattern 1: Console Login without MFA (failed OR successful without MFA)
-    if event_name == 'ConsoleLogin':
-        additional_data = detail.get('additionalEventData', {})
-        mfa_used = additional_data.get('MFAUsed', 'Yes')
-        response_elements = detail.get('responseElements', {})
-        login_result = response_elements.get('ConsoleLogin', '')
-        
-        # Detect MFA failure: either failed login or successful login without MFA
-        if mfa_used == 'No':
-            if error_message:
-                # Failed login attempt without MFA
-                incident = create_mfa_auth_failure_incident(
-                    user=username,
-                    source_ip=source_ip,
-                    cloudtrail_detail=detail,
-                    failure_type='authentication_failed'
-                )
-            elif login_result == 'Success':
-                # Successful login WITHOUT MFA (policy gap)
-                incident = create_mfa_auth_failure_incident(
-                    user=username,
-                    source_ip=source_ip,
-                    cloudtrail_detail=detail,
-                    failure_type='mfa_not_enforced'
-                )
+    # Pattern 1: Per-event-name detectors (ConsoleLogin without MFA)
+    detector = EVENT_DETECTORS.get(event_name)
+    if detector is not None:
+        incident = detector(detail, username, source_ip, now, now_iso)
     
     # Pattern 2: AccessDenied (Policy mismatch)
-    elif error_code in ['AccessDenied', 'UnauthorizedAccess']:
+    elif error_code in ACCESS_DENIED_CODES:
         # Check if MFA was present in session
         session_context = user_identity.get('sessionContext', {})
         session_attrs = session_context.get('attributes', {})
@@ -126,9 +239,35 @@ def process_cloudtrail_event(event: Dict[str, Any]) -> Dict[str, Any]:
                 user=username,
                 source_ip=source_ip,
                 denied_action=event_name,
-                cloudtrail_detail=detail
+                cloudtrail_detail=detail,
+                now=now,
+                now_iso=now_iso
             )
     
+    return incident, event_name
+
+
+def process_cloudtrail_event(event: Dict[str, Any], now: int, now_iso: str) -> Dict[str, Any]:
+    """
+    Process real CloudTrail events from EventBridge.
+    
+    Detects:
+    - ConsoleLogin failures (MFA auth failure pattern)
+    - ConsoleLogin success without MFA (MFA not enforced)
+    - AccessDenied errors (policy mismatch pattern)
+    """
+    incident, event_name = detect_cloudtrail_incident(event, now, now_iso)
+    
+    # One structured summary line per invocation instead of per-step lines
+    # (built only when INFO is enabled; prod logs at WARNING)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({
+            'mode': 'detector',
+            'detail_type': event.get('detail-type', ''),
+            'event_name': event_name,
+            'incident_id': incident['incident_id'] if incident else None
+        }))
+    
     if incident:
         store_incident(incident)
         publish_alert(incident)
@@ -145,7 +284,6 @@ def process_cloudtrail_event(event: Dict[str, Any]) -> Dict[str, Any]:
             })
         }
     else:
-        print(f"[INFO] Event did not match any incident pattern: {event_name}")
         return {
             'statusCode': 200,
             'body': json.dumps({
@@ -156,7 +294,123 @@ def process_cloudtrail_event(event: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
-def process_simulator_event(event: Dict[str, Any]) -> Dict[str, Any]:
+def detect_console_login(
+    detail: Dict[str, Any],
+    username: str,
+    source_ip: str,
+    now: int,
+    now_iso: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Detect MFA issues on ConsoleLogin: a failed login or a successful login
+    without MFA. Returns None when MFA was used.
+    """
+    get = detail.get
+    if get('additionalEventData', {}).get('MFAUsed', 'Yes') != 'No':
+        return None
+    
+    if get('errorMessage', ''):
+        # Failed login attempt without MFA
+        failure_type = 'authentication_failed'
+    elif get('responseElements', {}).get('ConsoleLogin', '') == 'Success':
+        # Successful login WITHOUT MFA (policy gap)
+        failure_type = 'mfa_not_enforced'
+    else:
+        return None
+    
+    return create_mfa_auth_failure_incident(
+        user=username,
+        source_ip=source_ip,
+        cloudtrail_detail=detail,
+        failure_type=failure_type,
+        now=now,
+        now_iso=now_iso
+    )
+
+
+# CloudTrail eventName -> detector(detail, username, source_ip, now, now_iso)
+EVENT_DETECTORS = {
+    'ConsoleLogin': detect_console_login
+}
+
+
+def process_event_batch(records: list, now: int, now_iso: str) -> Dict[str, Any]:
+    """
+    Process a batch of CloudTrail events delivered through SQS.
+    
+    Each record body is an EventBridge event. Incidents from the whole batch
+    are stored, published and counted with one batched call each.
+    
+    Records that cannot be processed are returned in `batchItemFailures`
+    (ReportBatchItemFailures), so SQS redelivers only those and moves them
+    to the dead-letter queue after maxReceiveCount. Incident IDs are derived
+    from the CloudTrail eventID, so a redelivered event rewrites the same
+    item instead of creating a duplicate.
+    """
+    incidents = {}
+    incident_records = []
+    failed_records = []
+    for record in records:
+        message_id = record.get('messageId', '')
+        try:
+            event = json.loads(record['body'])
+            if not is_cloudtrail_event(event):
+                logger.warning(f"Skipping non-CloudTrail record {message_id}")
+                continue
+            
+            incident, _ = detect_cloudtrail_incident(event, now, now_iso)
+        except Exception as e:
+            # Malformed body (not JSON, not an object): fail only this record
+            logger.error(f"Failed to process record {message_id}: {str(e)}")
+            failed_records.append(message_id)
+            continue
+        
+        if incident:
+            # The same event delivered twice in one batch collapses to one incident
+            incidents.setdefault(incident['incident_id'], incident)
+            incident_records.append(message_id)
+    
+    incidents = list(incidents.values())
+    if incidents:
+        try:
+            store_incidents(incidents)
+        except Exception as e:
+            # Retry every record that produced an incident. Chunks already
+            # written are rewritten in place on redelivery, and alerts and
+            # metrics wait for a complete write so they are sent once.
+            logger.error(f"Failed to store batch incidents: {str(e)}")
+            failed_records.extend(incident_records)
+            incidents = []
+        else:
+            publish_alerts(incidents)
+            emit_metrics(incidents)
+    
+    incident_ids = [incident['incident_id'] for incident in incidents]
+    
+    # One summary line for the whole batch rather than one per record
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({
+            'mode': 'detector',
+            'records': len(records),
+            'incident_ids': incident_ids,
+            'failed_records': failed_records
+        }))
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'mode': 'detector',
+            'status': 'batch_processed',
+            'records': len(records),
+            'incident_ids': incident_ids,
+            'failed_records': len(failed_records)
+        }),
+        # Read by the SQS event source mapping
+        'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed_records]
+    }
+
+
+def process_simulator_event(event: Dict[str, Any], now: int, now_iso: str) -> Dict[str, Any]:
     """
     Process synthetic test events (manual CLI invoke).
     Original simulator functionality for testing and demos.
@@ -166,24 +420,26 @@ def process_simulator_event(event: Dict[str, Any]) -> Dict[str, Any]:
     source_ip = event.get('source_ip', '192.0.2.1')  # TEST-NET-1 per RFC 5737
     metadata = event.get('metadata', {})
     
-    print(f"[INFO] Simulator mode: generating {scenario} incident")
-    
     # Generate incident based on scenario
-    if scenario == 'mfa_auth_failure':
-        incident = simulate_mfa_auth_failure(user, source_ip, metadata)
-    elif scenario == 'rate_limiting':
-        incident = simulate_rate_limiting(user, source_ip, metadata)
-    elif scenario == 'policy_mismatch':
-        incident = simulate_policy_mismatch(user, source_ip, metadata)
-    else:
+    simulate = SIMULATORS.get(scenario)
+    if simulate is None:
         return {
             'statusCode': 400,
             'body': json.dumps({
                 'error': f'Unknown scenario: {scenario}',
-                'valid_scenarios': ['mfa_auth_failure', 'rate_limiting', 'policy_mismatch']
+                'valid_scenarios': VALID_SCENARIOS
             })
         }
     
+    incident = simulate(user, source_ip, metadata, now, now_iso)
+    
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({
+            'mode': 'simulator',
+            'scenario': scenario,
+            'incident_id': incident['incident_id']
+        }))
+    
     # Store incident in DynamoDB
     store_incident(incident)
     
@@ -205,98 +461,220 @@ def process_simulator_event(event: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def new_incident_id(prefix: str, now_ms: Optional[int] = None, entropy: Optional[bytes] = None) -> str:
+    """
+    Build a time-ordered incident ID: `<prefix>-<ULID>`.
+    
+    The ULID is a 48-bit millisecond timestamp (`now_ms`, defaulting to the
+    current time) followed by 80 random bits, Crockford base32 encoded to
+    26 characters. IDs with the same prefix sort by creation time, and the
+    random part makes collisions negligible (the old 8-hex-character
+    suffix collided after ~65k incidents). Within one millisecond the
+    previous ID is incremented instead, so IDs minted in sequence by a
+    container also sort in sequence.
+    
+    `entropy` (10 bytes) replaces the random part to make the ID
+    deterministic; see cloudtrail_incident_id.
+    """
+    global LAST_ULID_VALUE
+    
+    if now_ms is None:
+        now_ms = time.time_ns() // 1_000_000
+    
+    if entropy is not None:
+        value = (now_ms << 80) | int.from_bytes(entropy, 'big')
+    else:
+        value = (now_ms << 80) | int.from_bytes(urandom(10), 'big')
+        
+        # ULID monotonic mode: same millisecond must not sort before the last ID
+        if LAST_ULID_VALUE >> 80 == now_ms and value <= LAST_ULID_VALUE:
+            value = LAST_ULID_VALUE + 1
+        LAST_ULID_VALUE = value
+    
+    # One shift-and-mask per character; no divmod tuples or reversal
+    chars = [ULID_ALPHABET[(value >> shift) & 31] for shift in ULID_SHIFTS]
+    return f"{prefix}-{''.join(chars)}"
+
+
+def cloudtrail_incident_id(prefix: str, cloudtrail_detail: Dict[str, Any]) -> str:
+    """
+    Derive the incident ID of a CloudTrail event from its eventTime and eventID.
+    
+    SQS delivers at least once and retries failed records, so the same event
+    must always map to the same DynamoDB item: the ULID timestamp is the
+    event time and the random part is a hash of the eventID. Events missing
+    either field get a fresh random ID.
+    """
+    event_id = cloudtrail_detail.get('eventID')
+    event_time = cloudtrail_detail.get('eventTime')
+    if not event_id or not event_time:
+        return new_incident_id(prefix)
+    
+    try:
+        parsed = datetime.fromisoformat(event_time.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return new_incident_id(prefix)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    
+    entropy = hashlib.blake2b(f"{prefix}:{event_id}".encode(), digest_size=10).digest()
+    return new_incident_id(prefix, round(parsed.timestamp() * 1000), entropy)
+
+
+def resolve_clock(now: Optional[int], now_iso: Optional[str]) -> tuple:
+    """Return the invocation clock, reading it only when the caller did not."""
+    if now is None:
+        now = int(time.time())
+    if now_iso is None:
+        now_iso = datetime.fromtimestamp(now, tz=timezone.utc).isoformat()
+    return now, now_iso
+
+
+def summarize_event_data(data: Any, keys: Optional[tuple] = None) -> Dict[str, Any]:
+    """
+    Copy the scalar top-level values of a CloudTrail sub-document.
+    
+    requestParameters can carry whole policy documents or nested request
+    bodies, so nested values are dropped and strings are truncated to
+    EVENT_DATA_MAX_CHARS. `keys` restricts the copy to known fields.
+    Non-dict input (CloudTrail sends null for some calls) becomes {}.
+    """
+    if data.__class__ is not dict:
+        return {}
+    
+    summary = {}
+    for key in (keys if keys is not None else data):
+        value = data.get(key)
+        if value.__class__ is str:
+            summary[key] = value[:EVENT_DATA_MAX_CHARS]
+        elif value.__class__ in (bool, int):
+            summary[key] = value
+    return summary
+
+
+# Static fields of CloudTrail-detected incidents, built once at import.
+# Factories copy a template and fill in the per-event values.
+CLOUDTRAIL_MFA_TEMPLATES = {
+    'authentication_failed': {
+        'scenario': 'mfa_auth_failure',
+        'severity': 'MEDIUM',
+        'status': 'OPEN',
+        'detection_source': 'cloudtrail',
+        'recommended_action': 'User must re-authenticate with valid MFA token',
+        'auto_remediation': False,
+        'environment': ENVIRONMENT
+    },
+    'mfa_not_enforced': {
+        'scenario': 'mfa_auth_failure',
+        'severity': 'HIGH',  # Successful login without MFA is more severe
+        'status': 'OPEN',
+        'detection_source': 'cloudtrail',
+        'recommended_action': 'Review MFA enforcement policy for this user/role',
+        'auto_remediation': False,
+        'environment': ENVIRONMENT
+    }
+}
+# Unknown failure types keep the authentication_failed severity and
+# description but get the generic policy review action
+CLOUDTRAIL_MFA_DEFAULT_ACTION = 'Review MFA enforcement policy for this user/role'
+CLOUDTRAIL_MFA_DESCRIPTIONS = {
+    'authentication_failed': 'MFA authentication failure for user {user} consistent with token expiration or timing issue',
+    'mfa_not_enforced': 'Console login WITHOUT MFA for user {user} - MFA policy not enforced'
+}
+CLOUDTRAIL_POLICY_TEMPLATE = {
+    'scenario': 'policy_mismatch',
+    'severity': 'MEDIUM',
+    'status': 'OPEN',
+    'detection_source': 'cloudtrail',
+    'recommended_action': 'Admin must review IAM policy conditions for aws:MultiFactorAuthPresent',
+    'auto_remediation': False,
+    'environment': ENVIRONMENT
+}
+
+
 def create_mfa_auth_failure_incident(
     user: str, 
     source_ip: str, 
     cloudtrail_detail: Dict,
-    failure_type: str = 'authentication_failed'
+    failure_type: str = 'authentication_failed',
+    now: Optional[int] = None,
+    now_iso: Optional[str] = None
 ) -> Dict[str, Any]:
     """Create incident from real CloudTrail ConsoleLogin failure."""
-    incident_id = f"MFA-AUTH-{uuid.uuid4().hex[:8].upper()}"
-    timestamp = datetime.now(timezone.utc).isoformat()
-    
-    # Determine severity based on failure type
-    if failure_type == 'mfa_not_enforced':
-        severity = 'HIGH'  # Successful login without MFA is more severe
-        description = f'Console login WITHOUT MFA for user {user} - MFA policy not enforced'
-    else:
-        severity = 'MEDIUM'
-        description = f'MFA authentication failure for user {user} consistent with token expiration or timing issue'
+    now, now_iso = resolve_clock(now, now_iso)
+    get = cloudtrail_detail.get
+    template_key = failure_type if failure_type in CLOUDTRAIL_MFA_TEMPLATES else 'authentication_failed'
     
-    return {
-        'incident_id': incident_id,
-        'scenario': 'mfa_auth_failure',
-        'severity': severity,
-        'status': 'OPEN',
-        'timestamp': timestamp,
-        'created_at': int(time.time()),
-        'user': user,
-        'source_ip': source_ip,
-        'detection_source': 'cloudtrail',
-        'failure_type': failure_type,
-        'detection_signal': {
+    incident = CLOUDTRAIL_MFA_TEMPLATES[template_key].copy()
+    if template_key != failure_type:
+        incident['recommended_action'] = CLOUDTRAIL_MFA_DEFAULT_ACTION
+    incident.update(
+        incident_id=cloudtrail_incident_id('MFA-AUTH', cloudtrail_detail),
+        timestamp=now_iso,
+        created_at=now,
+        user=user,
+        source_ip=source_ip,
+        failure_type=failure_type,
+        detection_signal={
             'event_name': 'ConsoleLogin',
             'event_source': 'signin.amazonaws.com',
-            'error_message': cloudtrail_detail.get('errorMessage', ''),
-            'event_time': cloudtrail_detail.get('eventTime', ''),
-            'aws_region': cloudtrail_detail.get('awsRegion', ''),
-            'login_result': cloudtrail_detail.get('responseElements', {}).get('ConsoleLogin', ''),
-            'additional_event_data': cloudtrail_detail.get('additionalEventData', {})
+            'error_message': get('errorMessage', ''),
+            'event_time': get('eventTime', ''),
+            'aws_region': get('awsRegion', ''),
+            'login_result': get('responseElements', {}).get('ConsoleLogin', ''),
+            'additional_event_data': summarize_event_data(
+                get('additionalEventData'), MFA_EVENT_DATA_KEYS
+            )
         },
-        'description': description,
-        'recommended_action': 'User must re-authenticate with valid MFA token' if failure_type == 'authentication_failed' else 'Review MFA enforcement policy for this user/role',
-        'auto_remediation': False,
-        'environment': ENVIRONMENT,
-        'ttl': int(time.time()) + (7 * 24 * 60 * 60)
-    }
+        description=CLOUDTRAIL_MFA_DESCRIPTIONS[template_key].format(user=user),
+        ttl=now + INCIDENT_TTL_SECONDS
+    )
+    return incident
 
 
-def create_policy_mismatch_incident(user: str, source_ip: str, denied_action: str, cloudtrail_detail: Dict) -> Dict[str, Any]:
+def create_policy_mismatch_incident(
+    user: str,
+    source_ip: str,
+    denied_action: str,
+    cloudtrail_detail: Dict,
+    now: Optional[int] = None,
+    now_iso: Optional[str] = None
+) -> Dict[str, Any]:
     """Create incident from real CloudTrail AccessDenied event."""
-    incident_id = f"POLICY-{uuid.uuid4().hex[:8].upper()}"
-    timestamp = datetime.now(timezone.utc).isoformat()
-    
-    return {
-        'incident_id': incident_id,
-        'scenario': 'policy_mismatch',
-        'severity': 'MEDIUM',
-        'status': 'OPEN',
-        'timestamp': timestamp,
-        'created_at': int(time.time()),
-        'user': user,
-        'source_ip': source_ip,
-        'detection_source': 'cloudtrail',
-        'detection_signal': {
+    now, now_iso = resolve_clock(now, now_iso)
+    get = cloudtrail_detail.get
+    incident = CLOUDTRAIL_POLICY_TEMPLATE.copy()
+    incident.update(
+        incident_id=cloudtrail_incident_id('POLICY', cloudtrail_detail),
+        timestamp=now_iso,
+        created_at=now,
+        user=user,
+        source_ip=source_ip,
+        detection_signal={
             'event_name': denied_action,
-            'event_source': cloudtrail_detail.get('eventSource', ''),
-            'error_code': cloudtrail_detail.get('errorCode', 'AccessDenied'),
-            'error_message': cloudtrail_detail.get('errorMessage', ''),
-            'event_time': cloudtrail_detail.get('eventTime', ''),
-            'request_parameters': cloudtrail_detail.get('requestParameters', {})
+            'event_source': get('eventSource', ''),
+            'error_code': get('errorCode', 'AccessDenied'),
+            'error_message': get('errorMessage', ''),
+            'event_time': get('eventTime', ''),
+            'request_parameters': summarize_event_data(get('requestParameters'))
         },
-        'description': f'Policy mismatch: User {user} has MFA session but {denied_action} denied due to condition mismatch',
-        'recommended_action': 'Admin must review IAM policy conditions for aws:MultiFactorAuthPresent',
-        'auto_remediation': False,
-        'environment': ENVIRONMENT,
-        'ttl': int(time.time()) + (7 * 24 * 60 * 60)
-    }
+        description=f'Policy mismatch: User {user} has MFA session but {denied_action} denied due to condition mismatch',
+        ttl=now + INCIDENT_TTL_SECONDS
+    )
+    return incident
 
 
-def simulate_mfa_auth_failure(user: str, source_ip: str, metadata: Dict) -> Dict[str, Any]:
-    """Simulate MFA authentication failure for testing."""
-    incident_id = f"MFA-AUTH-{uuid.uuid4().hex[:8].upper()}"
-    timestamp = datetime.now(timezone.utc).isoformat()
-    
-    return {
-        'incident_id': incident_id,
-        'scenario': 'mfa_auth_failure',
-        'severity': 'MEDIUM',
-        'status': 'OPEN',
-        'timestamp': timestamp,
-        'created_at': int(time.time()),
-        'user': user,
-        'source_ip': source_ip,
-        'detection_source': 'simulator',
+# Fixed fields per simulated scenario, merged by build_incident. Nested
+# values are deep-copied into each incident, so stored incidents never
+# share them.
+SCENARIO_SPECS = {
+    'mfa_auth_failure': {
+        'id_prefix': 'MFA-AUTH',
+        'fields': {
+            'severity': 'MEDIUM',
+            'recommended_action': 'User must re-authenticate with valid MFA token',
+            'auto_remediation': False
+        },
         'detection_signal': {
             'event_name': 'ConsoleLogin',
             'event_source': 'signin.amazonaws.com',
@@ -307,146 +685,387 @@ def simulate_mfa_auth_failure(user: str, source_ip: str, metadata: Dict) -> Dict
                 'MobileVersion': 'No'
             }
         },
-        'description': f'MFA authentication failure for user {user} consistent with token expiration or timing issue',
-        'recommended_action': 'User must re-authenticate with valid MFA token',
-        'auto_remediation': False,
-        'metadata': metadata,
-        'environment': ENVIRONMENT,
-        'ttl': int(time.time()) + (7 * 24 * 60 * 60)
+        'description': 'MFA authentication failure for user {user} consistent with token expiration or timing issue'
+    },
+    'rate_limiting': {
+        'id_prefix': 'RATE-LIMIT',
+        'fields': {
+            'severity': 'HIGH',
+            'recommended_action': 'Wait for cooldown period, then attempt re-authentication',
+            'auto_remediation': True,
+            'remediation_type': 'assisted',
+            'cooldown_seconds': 300
+        },
+        'detection_signal': {
+            'event_name': 'ConsoleLogin',
+            'event_source': 'signin.amazonaws.com',
+            'pattern': 'Multiple failed attempts from same user and IP'
+        },
+        'description': 'Rate limiting triggered: {failure_count} failed MFA attempts in {window_seconds}s for user {user}'
+    },
+    'policy_mismatch': {
+        'id_prefix': 'POLICY',
+        'fields': {
+            'severity': 'MEDIUM',
+            'recommended_action': 'Admin must review IAM policy conditions for aws:MultiFactorAuthPresent',
+            'auto_remediation': False
+        },
+        'detection_signal': {
+            'error_code': 'AccessDenied',
+            'error_message': 'User has MFA but policy condition denies action',
+            'condition_evaluated': 'aws:MultiFactorAuthPresent',
+            'condition_result': 'false (expected true)'
+        },
+        'description': 'Policy mismatch: User {user} has MFA session but {denied_action} denied due to condition mismatch'
     }
+}
 
 
-def simulate_rate_limiting(user: str, source_ip: str, metadata: Dict) -> Dict[str, Any]:
-    """Simulate rate limiting scenario for testing."""
-    incident_id = f"RATE-LIMIT-{uuid.uuid4().hex[:8].upper()}"
-    timestamp = datetime.now(timezone.utc).isoformat()
+def build_incident(
+    scenario: str,
+    user: str,
+    source_ip: str,
+    metadata: Dict,
+    now: int,
+    now_iso: str,
+    signal_fields: Optional[Dict[str, Any]] = None,
+    description_fields: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build a simulated incident from its SCENARIO_SPECS entry.
     
-    failure_count = metadata.get('failure_count', 5)
-    window_seconds = metadata.get('window_seconds', 60)
+    `signal_fields` are merged over the scenario's static detection_signal;
+    `description_fields` fill the description template alongside `user`.
+    """
+    spec = SCENARIO_SPECS[scenario]
     
-    return {
-        'incident_id': incident_id,
-        'scenario': 'rate_limiting',
-        'severity': 'HIGH',
+    # Deep copy: the signal nests dicts (additional_event_data) that must
+    # not be shared across incidents. Skip the merge and kwargs expansion
+    # for scenarios without extra fields.
+    detection_signal = copy.deepcopy(spec['detection_signal'])
+    if signal_fields:
+        detection_signal.update(signal_fields)
+    if description_fields:
+        description = spec['description'].format(user=user, **description_fields)
+    else:
+        description = spec['description'].format(user=user)
+    
+    incident = {
+        'scenario': scenario,
         'status': 'OPEN',
-        'timestamp': timestamp,
-        'created_at': int(time.time()),
-        'user': user,
-        'source_ip': source_ip,
         'detection_source': 'simulator',
-        'detection_signal': {
-            'event_name': 'ConsoleLogin',
-            'event_source': 'signin.amazonaws.com',
-            'failure_count': failure_count,
-            'window_seconds': window_seconds,
-            'pattern': 'Multiple failed attempts from same user and IP'
-        },
-        'description': f'Rate limiting triggered: {failure_count} failed MFA attempts in {window_seconds}s for user {user}',
-        'recommended_action': 'Wait for cooldown period, then attempt re-authentication',
-        'auto_remediation': True,
-        'remediation_type': 'assisted',
-        'cooldown_seconds': 300,
-        'metadata': metadata,
         'environment': ENVIRONMENT,
-        'ttl': int(time.time()) + (7 * 24 * 60 * 60)
+        **spec['fields']
     }
+    incident.update(
+        incident_id=new_incident_id(spec['id_prefix']),
+        timestamp=now_iso,
+        created_at=now,
+        user=user,
+        source_ip=source_ip,
+        detection_signal=detection_signal,
+        description=description,
+        metadata=metadata,
+        ttl=now + INCIDENT_TTL_SECONDS
+    )
+    return incident
 
 
-def simulate_policy_mismatch(user: str, source_ip: str, metadata: Dict) -> Dict[str, Any]:
-    """Simulate policy mismatch scenario for testing."""
-    incident_id = f"POLICY-{uuid.uuid4().hex[:8].upper()}"
-    timestamp = datetime.now(timezone.utc).isoformat()
+def simulate_mfa_auth_failure(user: str, source_ip: str, metadata: Dict, now: int, now_iso: str) -> Dict[str, Any]:
+    """Simulate MFA authentication failure for testing."""
+    return build_incident('mfa_auth_failure', user, source_ip, metadata, now, now_iso)
+
+
+def simulate_rate_limiting(user: str, source_ip: str, metadata: Dict, now: int, now_iso: str) -> Dict[str, Any]:
+    """Simulate rate limiting scenario for testing."""
+    counts = {
+        'failure_count': metadata.get('failure_count', 5),
+        'window_seconds': metadata.get('window_seconds', 60)
+    }
+    
+    incident = build_incident(
+        'rate_limiting', user, source_ip, metadata, now, now_iso,
+        signal_fields=counts,
+        description_fields=counts
+    )
     
+    # Sparse remediation-ready-index membership; the responder REMOVEs
+    # gsi_pk on resolution so the item drops out of the index
+    incident['gsi_pk'] = REMEDIATION_GSI_PK
+    incident['remediation_ready_at'] = now + incident['cooldown_seconds']
+    
+    return incident
+
+
+def simulate_policy_mismatch(user: str, source_ip: str, metadata: Dict, now: int, now_iso: str) -> Dict[str, Any]:
+    """Simulate policy mismatch scenario for testing."""
     denied_action = metadata.get('denied_action', 's3:GetObject')
     resource = metadata.get('resource', 'arn:aws:s3:::sensitive-bucket/*')
     
-    return {
-        'incident_id': incident_id,
-        'scenario': 'policy_mismatch',
-        'severity': 'MEDIUM',
-        'status': 'OPEN',
-        'timestamp': timestamp,
-        'created_at': int(time.time()),
-        'user': user,
-        'source_ip': source_ip,
-        'detection_source': 'simulator',
-        'detection_signal': {
-            'event_name': denied_action.split(':')[1] if ':' in denied_action else denied_action,
-            'event_source': f"{denied_action.split(':')[0]}.amazonaws.com" if ':' in denied_action else 'aws.amazonaws.com',
-            'error_code': 'AccessDenied',
-            'error_message': 'User has MFA but policy condition denies action',
-            'condition_evaluated': 'aws:MultiFactorAuthPresent',
-            'condition_result': 'false (expected true)',
+    # 'service:Action' -> ('service', ':', 'Action'); a bare action has no separator
+    service, separator, action = denied_action.partition(':')
+    if not separator:
+        service, action = 'aws', denied_action
+    
+    return build_incident(
+        'policy_mismatch', user, source_ip, metadata, now, now_iso,
+        signal_fields={
+            'event_name': action,
+            'event_source': f"{service}.amazonaws.com",
             'attempted_action': denied_action,
             'resource': resource
         },
-        'description': f'Policy mismatch: User {user} has MFA session but {denied_action} denied due to condition mismatch',
-        'recommended_action': 'Admin must review IAM policy conditions for aws:MultiFactorAuthPresent',
-        'auto_remediation': False,
-        'metadata': metadata,
-        'environment': ENVIRONMENT,
-        'ttl': int(time.time()) + (7 * 24 * 60 * 60)
-    }
+        description_fields={'denied_action': denied_action}
+    )
+
+
+# Scenario -> simulate_* factory used by process_simulator_event
+SIMULATORS = {
+    'mfa_auth_failure': simulate_mfa_auth_failure,
+    'rate_limiting': simulate_rate_limiting,
+    'policy_mismatch': simulate_policy_mismatch
+}
+VALID_SCENARIOS = list(SIMULATORS)
+
+
+def chunked(items: list, size: int) -> list:
+    """Split a list into consecutive chunks of at most `size` items."""
+    return [items[start:start + size] for start in range(0, len(items), size)]
 
 
 def store_incident(incident: Dict[str, Any]) -> None:
-    """Store incident in DynamoDB."""
+    """Store a single incident in DynamoDB."""
+    store_incidents([incident])
+
+
+def store_incidents(incidents: list) -> None:
+    """
+    Store incidents in DynamoDB with BatchWriteItem.
+    
+    Items are sent 25 puts per request (⌈N/25⌉ round trips instead of N)
+    through the low-level client; multiple chunks are written concurrently.
+    """
     try:
-        table = dynamodb.Table(TABLE_NAME)
-        table.put_item(Item=incident)
-        print(f"[INFO] Stored incident {incident['incident_id']} in DynamoDB")
+        # BatchWriteItem rejects duplicate keys in one request; last write wins
+        requests = {}
+        for incident in incidents:
+            try:
+                requests[incident['incident_id']] = {'PutRequest': {'Item': serialize_item(incident)}}
+            except TypeError as e:
+                # to_dynamodb rejects floats; name the incident that carried one
+                raise TypeError(f"Incident {incident['incident_id']}: {str(e)}") from e
+        
+        # Build the client before fanning out; boto3 sessions are not thread-safe
+        get_dynamodb()
+        
+        chunks = chunked(list(requests.values()), DYNAMODB_BATCH_MAX_ITEMS)
+        if len(chunks) <= 1:
+            list(map(store_incidents_chunk, chunks))
+        else:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                list(executor.map(store_incidents_chunk, chunks))
+        logger.debug(f"Stored {len(requests)} incident(s) in DynamoDB")
     except Exception as e:
-        print(f"[ERROR] Failed to store incident: {str(e)}")
+        logger.error(f"Failed to store incidents: {str(e)}")
         raise
 
 
+def store_incidents_chunk(chunk: list) -> None:
+    """
+    Write one BatchWriteItem request of up to 25 puts.
+    
+    UnprocessedItems (throttling or partition pressure) are resubmitted with
+    exponential backoff; raises if any remain after BATCH_WRITE_MAX_ATTEMPTS.
+    """
+    request_items = {TABLE_NAME: chunk}
+    delay = BATCH_WRITE_BASE_DELAY_SECONDS
+    
+    for attempt in range(BATCH_WRITE_MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(delay)
+            delay *= 2
+        
+        response = get_dynamodb().batch_write_item(RequestItems=request_items)
+        request_items = response.get('UnprocessedItems')
+        if not request_items:
+            return
+    
+    raise RuntimeError(f"{len(request_items[TABLE_NAME])} incident(s) left unprocessed")
+
+
+def serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize an incident to a DynamoDB item (attribute name -> value)."""
+    return {key: to_dynamodb(value) for key, value in item.items()}
+
+
+def to_dynamodb(value: Any) -> Dict[str, Any]:
+    """
+    Serialize a Python value to a DynamoDB attribute value.
+    
+    Covers the incident schema without boto3's TypeSerializer introspection.
+    bool is checked before int (bool subclasses int); floats are rejected,
+    as with the resource layer, because they cannot round-trip exactly.
+    """
+    cls = value.__class__
+    if cls is str:
+        return {'S': value}
+    if cls is bool:
+        return {'BOOL': value}
+    if cls is int or cls is Decimal:
+        return {'N': str(value)}
+    if cls is dict:
+        return {'M': {key: to_dynamodb(item) for key, item in value.items()}}
+    if cls is list or cls is tuple:
+        return {'L': [to_dynamodb(item) for item in value]}
+    if value is None:
+        return {'NULL': True}
+    raise TypeError(f"Unsupported DynamoDB attribute type: {cls.__name__}")
+
+
 def publish_alert(incident: Dict[str, Any]) -> None:
-    """Publish incident alert to SNS topic."""
+    """Publish a single incident alert to SNS topic."""
+    publish_alerts([incident])
+
+
+def publish_alerts(incidents: list) -> None:
+    """
+    Publish incident alerts to SNS topic using PublishBatch.
+    
+    HIGH severity incidents are alerted individually in chunks of up to 10
+    entries per request; multiple chunks are published concurrently. When
+    a batch holds more than one lower-severity incident, those are sent as
+    a single digest message instead. Failed entries are logged.
+    """
     if not SNS_TOPIC_ARN:
-        print("[WARN] SNS_TOPIC_ARN not configured, skipping alert")
+        logger.warning("SNS_TOPIC_ARN not configured, skipping alert")
+        return
+    
+    # Build the client before fanning out; boto3 sessions are not thread-safe
+    get_sns()
+    
+    immediate = []
+    digest = []
+    for incident in incidents:
+        if incident['severity'] in IMMEDIATE_ALERT_SEVERITIES:
+            immediate.append(incident)
+        else:
+            digest.append(incident)
+    
+    if len(digest) > 1:
+        list(map(publish_alert_digest, chunked(digest, ALERT_DIGEST_MAX_INCIDENTS)))
+    else:
+        immediate.extend(digest)
+    
+    chunks = chunked(immediate, SNS_BATCH_MAX_ENTRIES)
+    if len(chunks) <= 1:
+        # Common single-incident path: no worker threads needed
+        list(map(publish_alerts_chunk, chunks))
         return
     
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        list(executor.map(publish_alerts_chunk, chunks))
+
+
+def publish_alerts_chunk(chunk: list) -> None:
+    """Publish one PublishBatch request of up to 10 incident alerts."""
     try:
-        message = {
-            'incident_id': incident['incident_id'],
-            'scenario': incident['scenario'],
-            'severity': incident['severity'],
-            'user': incident['user'],
-            'description': incident['description'],
-            'timestamp': incident['timestamp'],
-            'detection_source': incident.get('detection_source', 'unknown'),
-            'recommended_action': incident['recommended_action']
-        }
+        entries = []
+        for incident in chunk:
+            message = {
+                'incident_id': incident['incident_id'],
+                'scenario': incident['scenario'],
+                'severity': incident['severity'],
+                'user': incident['user'],
+                'description': incident['description'],
+                'timestamp': incident['timestamp'],
+                'detection_source': incident.get('detection_source', 'unknown'),
+                'recommended_action': incident['recommended_action']
+            }
+            entries.append({
+                'Id': incident['incident_id'],
+                'Subject': f"[{incident['severity']}] MFA Incident: {incident['scenario']}",
+                'Message': MESSAGE_ENCODER.encode(message)
+            })
         
-        sns.publish(
+        response = get_sns().publish_batch(
             TopicArn=SNS_TOPIC_ARN,
-            Subject=f"[{incident['severity']}] MFA Incident: {incident['scenario']}",
-            Message=json.dumps(message, indent=2)
+            PublishBatchRequestEntries=entries
         )
-        print(f"[INFO] Published alert for incident {incident['incident_id']}")
+        
+        for failure in response.get('Failed', []):
+            logger.error(f"Failed to publish alert for {failure['Id']}: {failure.get('Code')} {failure.get('Message', '')}")
+        logger.debug(f"Published {len(entries) - len(response.get('Failed', []))} alert(s)")
     except Exception as e:
-        print(f"[ERROR] Failed to publish alert: {str(e)}")
+        logger.error(f"Failed to publish alert: {str(e)}")
 
 
-def emit_metric(incident: Dict[str, Any]) -> None:
-    """Emit CloudWatch metric for dashboard."""
+def publish_alert_digest(incidents: list) -> None:
+    """Publish one SNS message summarizing several lower-severity incidents."""
     try:
-        cloudwatch.put_metric_data(
-            Namespace='MFAIncidentSimulator',
-            MetricData=[
+        message = {
+            'digest': [
                 {
-                    'MetricName': 'IncidentCount',
-                    'Dimensions': [
-                        {'Name': 'Scenario', 'Value': incident['scenario']},
-                        {'Name': 'Severity', 'Value': incident['severity']},
-                        {'Name': 'Environment', 'Value': ENVIRONMENT},
-                        {'Name': 'Source', 'Value': incident.get('detection_source', 'unknown')}
-                    ],
-                    'Value': 1,
-                    'Unit': 'Count'
+                    'incident_id': incident['incident_id'],
+                    'scenario': incident['scenario'],
+                    'severity': incident['severity'],
+                    'user': incident['user'],
+                    'timestamp': incident['timestamp'],
+                    'detection_source': incident.get('detection_source', 'unknown')
                 }
+                for incident in incidents
             ]
+        }
+        
+        get_sns().publish(
+            TopicArn=SNS_TOPIC_ARN,
+            Subject=f"[DIGEST] {len(incidents)} MFA Incidents",
+            Message=MESSAGE_ENCODER.encode(message)
         )
-        print(f"[INFO] Emitted metric for incident {incident['incident_id']}")
+        logger.debug(f"Published digest of {len(incidents)} alert(s)")
     except Exception as e:
-        print(f"[ERROR] Failed to emit metric: {str(e)}")
+        logger.error(f"Failed to publish alert digest: {str(e)}")
+
+
+def emit_metric(incident: Dict[str, Any]) -> None:
+    """Emit the CloudWatch metric for a single incident."""
+    emit_metrics([incident])
+
+
+def emit_metrics(incidents: list) -> None:
+    """
+    Emit CloudWatch metrics for dashboard using Embedded Metric Format.
+    
+    Incidents are grouped by (Scenario, Severity, Source) and each group is
+    written as one log line carrying the summed IncidentCount. CloudWatch
+    Logs extracts the metrics asynchronously, so no PutMetricData request
+    is made from the Lambda.
+    """
+    groups = {}
+    for incident in incidents:
+        key = (incident['scenario'], incident['severity'], incident.get('detection_source', 'unknown'))
+        groups.setdefault(key, []).append(incident['incident_id'])
+    
+    timestamp = int(time.time() * 1000)
+    for (scenario, severity, source), incident_ids in groups.items():
+        try:
+            # Plain print: EMF must be the raw log line, without logger prefixes
+            print(json.dumps({
+                '_aws': {
+                    'Timestamp': timestamp,
+                    'CloudWatchMetrics': [
+                        {
+                            'Namespace': METRIC_NAMESPACE,
+                            'Dimensions': INCIDENT_METRIC_DIMENSIONS,
+                            'Metrics': [{'Name': 'IncidentCount', 'Unit': 'Count'}]
+                        }
+                    ]
+                },
+                'Scenario': scenario,
+                'Severity': severity,
+                'Environment': ENVIRONMENT,
+                'Source': source,
+                'IncidentCount': len(incident_ids),
+                'incident_ids': incident_ids
+            }))
+        except Exception as e:
+            logger.error(f"Failed to emit metric: {str(e)}")
@@ -21,6 +21,16 @@ resource "aws_dynamodb_table" "incidents" {
     type = "N"
   }
 
+  attribute {
+    name = "gsi_pk"
+    type = "S"
+  }
+
+  attribute {
+    name = "remediation_ready_at"
+    type = "N"
+  }
+
   global_secondary_index {
     name            = "scenario-created-index"
     hash_key        = "scenario"
@@ -28,6 +38,15 @@ resource "aws_dynamodb_table" "incidents" {
     projection_type = "ALL"
   }
 
+  # Responder eligibility lookups. Sparse: only OPEN rate_limiting incidents
+  # carry gsi_pk, and the responder removes it when resolving.
+  global_secondary_index {
+    name            = "remediation-ready-index"
+    hash_key        = "gsi_pk"
+    range_key       = "remediation_ready_at"
+    projection_type = "ALL"
+  }
+
   # Enable TTL for automatic cleanup
   ttl {
     attribute_name = "ttl"
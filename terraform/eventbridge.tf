@@ -3,6 +3,7 @@
 # Note: These rules would detect REAL CloudTrail events in production.
 # For the simulator, we trigger Lambda directly. These rules are included
 # to demonstrate the detection architecture and for future integration.
+# Matched events are buffered in SQS and delivered to Lambda in batches.
 
 # Rule 1: Detect ConsoleLogin failures (MFA auth failure pattern)
 resource "aws_cloudwatch_event_rule" "console_login_failure" {
@@ -44,36 +45,89 @@ resource "aws_cloudwatch_event_rule" "access_denied" {
   }
 }
 
-# Lambda permission for EventBridge rules (when using real CloudTrail events)
-resource "aws_lambda_permission" "eventbridge_console_login" {
-  statement_id  = "AllowEventBridgeConsoleLogin"
-  action        = "lambda:InvokeFunction"
-  function_name = aws_lambda_function.simulator.function_name
-  principal     = "events.amazonaws.com"
-  source_arn    = aws_cloudwatch_event_rule.console_login_failure.arn
+# SQS buffer between the CloudTrail rules and the detector Lambda.
+# The event source mapping below hands events to Lambda in batches, so a
+# burst of CloudTrail events costs a few invocations instead of one each.
+#
+# The detector reports failed records individually (ReportBatchItemFailures),
+# so only those are redelivered; after detector_max_receive_count attempts
+# SQS moves them to the dead-letter queue instead of retrying until expiry.
+resource "aws_sqs_queue" "detector_events" {
+  name = "${local.name_prefix}-detector-events"
+  # AWS guidance for SQS event sources: at least 6x the function timeout
+  # plus the batching window
+  visibility_timeout_seconds = 6 * aws_lambda_function.simulator.timeout + var.detector_batching_window_seconds
+  message_retention_seconds  = 86400
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.detector_events_dlq.arn
+    maxReceiveCount     = var.detector_max_receive_count
+  })
+
+  tags = {
+    Name = "${local.name_prefix}-detector-events"
+  }
 }
 
-resource "aws_lambda_permission" "eventbridge_access_denied" {
-  statement_id  = "AllowEventBridgeAccessDenied"
-  action        = "lambda:InvokeFunction"
-  function_name = aws_lambda_function.simulator.function_name
-  principal     = "events.amazonaws.com"
-  source_arn    = aws_cloudwatch_event_rule.access_denied.arn
+# Undeliverable detector events (malformed bodies, repeated write failures)
+# kept for 14 days for inspection and redrive
+resource "aws_sqs_queue" "detector_events_dlq" {
+  name                      = "${local.name_prefix}-detector-events-dlq"
+  message_retention_seconds = 1209600
+
+  tags = {
+    Name = "${local.name_prefix}-detector-events-dlq"
+  }
+}
+
+resource "aws_sqs_queue_policy" "detector_events" {
+  queue_url = aws_sqs_queue.detector_events.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Sid       = "AllowEventBridgeRules"
+      Effect    = "Allow"
+      Principal = { Service = "events.amazonaws.com" }
+      Action    = "sqs:SendMessage"
+      Resource  = aws_sqs_queue.detector_events.arn
+      Condition = {
+        ArnEquals = {
+          "aws:SourceArn" = [
+            aws_cloudwatch_event_rule.console_login_failure.arn,
+            aws_cloudwatch_event_rule.access_denied.arn
+          ]
+        }
+      }
+    }]
+  })
 }
 
 # Event targets for real CloudTrail integration
-# These connect EventBridge rules to the Lambda for live detection
+# These connect EventBridge rules to the detector queue for live detection
 
-resource "aws_cloudwatch_event_target" "console_login_to_lambda" {
+resource "aws_cloudwatch_event_target" "console_login_to_queue" {
   rule      = aws_cloudwatch_event_rule.console_login_failure.name
   target_id = "process-console-login-failure"
-  arn       = aws_lambda_function.simulator.arn
+  arn       = aws_sqs_queue.detector_events.arn
 }
 
-resource "aws_cloudwatch_event_target" "access_denied_to_lambda" {
+resource "aws_cloudwatch_event_target" "access_denied_to_queue" {
   rule      = aws_cloudwatch_event_rule.access_denied.name
   target_id = "process-access-denied"
-  arn       = aws_lambda_function.simulator.arn
+  arn       = aws_sqs_queue.detector_events.arn
+}
+
+# Lambda polls the queue with the function's execution role
+# (var.lambda_role_arn), which needs sqs:ReceiveMessage, sqs:DeleteMessage and
+# sqs:GetQueueAttributes on it; otherwise the mapping fails to create or is
+# left disabled.
+resource "aws_lambda_event_source_mapping" "detector_events" {
+  event_source_arn                   = aws_sqs_queue.detector_events.arn
+  function_name                      = aws_lambda_function.simulator.arn
+  batch_size                         = var.detector_batch_size
+  maximum_batching_window_in_seconds = var.detector_batching_window_seconds
+  function_response_types            = ["ReportBatchItemFailures"]
 }
 
 output "eventbridge_rule_console_login" {
@@ -86,3 +140,12 @@ output "eventbridge_rule_access_denied" {
   value       = aws_cloudwatch_event_rule.access_denied.name
 }
 
+output "detector_queue_url" {
+  description = "SQS queue buffering CloudTrail events for the detector"
+  value       = aws_sqs_queue.detector_events.url
+}
+
+output "detector_dlq_url" {
+  description = "Dead-letter queue for detector events that repeatedly failed"
+  value       = aws_sqs_queue.detector_events_dlq.url
+}
@@ -1,23 +1,49 @@
 # Lambda functions for incident simulation and response
 
-# Use existing lab Lambda execution role
+# Use existing lab Lambda execution role. Terraform does not manage its
+# policies, so the role must already allow the SQS event source mapping
+# (see eventbridge.tf) to poll the detector queue.
 variable "lambda_role_arn" {
-  description = "ARN of existing Lambda execution role"
+  description = "ARN of existing Lambda execution role; must allow sqs:ReceiveMessage, sqs:DeleteMessage and sqs:GetQueueAttributes on the detector queue"
   type        = string
   default     = "arn:aws:iam::637423174317:role/LabRole"
 }
 
-# Package Lambda code
+# Package Lambda code. Deploy-time constants are written into
+# build_config.py instead of environment variables.
+#
+# Only handler.py and build_config.py are zipped: boto3/botocore come from
+# the python3.11 runtime, so no service models are shipped or loaded from
+# the package. Keep it that way rather than pip-installing requirements.txt
+# into the zip.
 data "archive_file" "simulator" {
   type        = "zip"
-  source_dir  = "${path.module}/../lambda/simulator"
   output_path = "${path.module}/files/simulator.zip"
+
+  source {
+    content  = file("${path.module}/../lambda/simulator/handler.py")
+    filename = "handler.py"
+  }
+
+  source {
+    content  = local.build_config
+    filename = "build_config.py"
+  }
 }
 
 data "archive_file" "responder" {
   type        = "zip"
-  source_dir  = "${path.module}/../lambda/responder"
   output_path = "${path.module}/files/responder.zip"
+
+  source {
+    content  = file("${path.module}/../lambda/responder/handler.py")
+    filename = "handler.py"
+  }
+
+  source {
+    content  = local.build_config
+    filename = "build_config.py"
+  }
 }
 
 # Simulator Lambda
@@ -28,6 +54,7 @@ resource "aws_lambda_function" "simulator" {
   handler          = "handler.lambda_handler"
   source_code_hash = data.archive_file.simulator.output_base64sha256
   runtime          = "python3.11"
+  architectures    = [var.lambda_architecture]
   timeout          = 30
   memory_size      = 128
 
@@ -35,7 +62,6 @@ resource "aws_lambda_function" "simulator" {
     variables = {
       INCIDENTS_TABLE = aws_dynamodb_table.incidents.name
       SNS_TOPIC_ARN   = aws_sns_topic.incidents.arn
-      ENVIRONMENT     = var.environment
     }
   }
 
@@ -52,6 +78,7 @@ resource "aws_lambda_function" "responder" {
   handler          = "handler.lambda_handler"
   source_code_hash = data.archive_file.responder.output_base64sha256
   runtime          = "python3.11"
+  architectures    = [var.lambda_architecture]
   timeout          = 60
   memory_size      = 128
 
@@ -59,7 +86,6 @@ resource "aws_lambda_function" "responder" {
     variables = {
       INCIDENTS_TABLE = aws_dynamodb_table.incidents.name
       SNS_TOPIC_ARN   = aws_sns_topic.incidents.arn
-      ENVIRONMENT     = var.environment
     }
   }
 
@@ -100,6 +126,31 @@ resource "aws_lambda_permission" "responder_eventbridge" {
   source_arn    = aws_cloudwatch_event_rule.responder_schedule.arn
 }
 
+# EventBridge rule to keep the simulator warm between test-driven invokes
+resource "aws_cloudwatch_event_rule" "simulator_warmer" {
+  count               = var.simulator_warmer_schedule == "" ? 0 : 1
+  name                = "${local.name_prefix}-simulator-warmer"
+  description         = "Ping simulator Lambda so boto3 init is not paid on the next real invoke"
+  schedule_expression = var.simulator_warmer_schedule
+}
+
+resource "aws_cloudwatch_event_target" "simulator_warmer" {
+  count     = var.simulator_warmer_schedule == "" ? 0 : 1
+  rule      = aws_cloudwatch_event_rule.simulator_warmer[0].name
+  target_id = "simulator-warmer"
+  arn       = aws_lambda_function.simulator.arn
+  input     = jsonencode({ scenario = "ping" })
+}
+
+resource "aws_lambda_permission" "simulator_warmer" {
+  count         = var.simulator_warmer_schedule == "" ? 0 : 1
+  statement_id  = "AllowEventBridgeWarmer"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.simulator.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.simulator_warmer[0].arn
+}
+
 # Outputs
 output "simulator_function_name" {
   description = "Simulator Lambda function name"
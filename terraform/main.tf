@@ -38,5 +38,14 @@ locals {
   account_id  = data.aws_caller_identity.current.account_id
   region      = data.aws_region.current.name
   name_prefix = "${var.project_name}-${var.environment}"
+
+  # Per-incident INFO logs are dropped in prod to cut CloudWatch Logs volume
+  log_level = var.environment == "prod" ? "WARNING" : "INFO"
+
+  # Baked into each Lambda package as Python literals (see lambda.tf)
+  build_config = <<-EOT
+    ENVIRONMENT = "${var.environment}"
+    LOG_LEVEL   = "${local.log_level}"
+  EOT
 }
 
@@ -42,3 +42,37 @@ variable "responder_schedule" {
   default     = "rate(5 minutes)"
 }
 
+variable "detector_batch_size" {
+  description = "Maximum CloudTrail events per detector invocation (SQS batch size)"
+  type        = number
+  default     = 100
+}
+
+variable "detector_batching_window_seconds" {
+  description = "Seconds SQS waits to fill a detector batch before invoking Lambda"
+  type        = number
+  default     = 30
+}
+
+variable "detector_max_receive_count" {
+  description = "Deliveries of a failing detector event before SQS moves it to the dead-letter queue"
+  type        = number
+  default     = 5
+}
+
+variable "simulator_warmer_schedule" {
+  description = "Schedule expression for simulator keep-warm pings (empty string disables)"
+  type        = string
+  default     = "rate(5 minutes)"
+}
+
+variable "lambda_architecture" {
+  description = "Lambda instruction set architecture (arm64 = Graviton, x86_64)"
+  type        = string
+  default     = "arm64"
+
+  validation {
+    condition     = contains(["arm64", "x86_64"], var.lambda_architecture)
+    error_message = "lambda_architecture must be arm64 or x86_64."
+  }
+}
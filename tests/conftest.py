@@ -9,7 +9,11 @@ Uses moto to mock AWS services:
 This allows testing Lambda logic without hitting real AWS.
 """
 
+import functools
+import importlib.util
+import json
 import os
+import sys
 import pytest
 import boto3
 from moto import mock_aws
@@ -27,7 +31,81 @@ def set_env_vars():
     os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
 
 
-@pytest.fixture
+# =============================================================================
+# Handler Modules
+# =============================================================================
+# Handle 'lambda' being a reserved keyword in Python by loading dynamically
+
+# Candidate simulator handler locations, resolved once
+HANDLER_PATHS = tuple(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', *parts, 'simulator', 'handler.py'))
+    for parts in (('src',), ('lambda',))
+)
+RESPONDER_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'lambda', 'responder', 'handler.py')
+)
+
+
+@functools.lru_cache(maxsize=1)
+def load_handler_module():
+    """Dynamically load handler from lambda directory (reserved keyword workaround)."""
+    # Reuse a copy already executed in this session rather than re-running its source
+    if "simulator_handler" in sys.modules:
+        return sys.modules["simulator_handler"]
+    
+    for handler_path in HANDLER_PATHS:
+        if os.path.isfile(handler_path):
+            spec = importlib.util.spec_from_file_location("simulator_handler", handler_path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules["simulator_handler"] = module
+            spec.loader.exec_module(module)
+            return module
+    
+    raise FileNotFoundError(f"Handler not found in: {list(HANDLER_PATHS)}")
+
+
+@functools.lru_cache(maxsize=1)
+def load_responder_module():
+    """Dynamically load responder from lambda directory (reserved keyword workaround)."""
+    if "responder_handler" in sys.modules:
+        return sys.modules["responder_handler"]
+    
+    if not os.path.isfile(RESPONDER_PATH):
+        raise FileNotFoundError(f"Responder not found at: {RESPONDER_PATH}")
+    
+    spec = importlib.util.spec_from_file_location("responder_handler", RESPONDER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["responder_handler"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# Loaded once per session, after set_env_vars, since the handlers read
+# their configuration from the environment at import time
+@pytest.fixture(scope="session")
+def handler(set_env_vars):
+    """The simulator Lambda handler module."""
+    return load_handler_module()
+
+
+@pytest.fixture(scope="session")
+def responder(set_env_vars):
+    """The responder Lambda handler module."""
+    return load_responder_module()
+
+
+def parse_response_body(response):
+    """Parse a Lambda response body."""
+    return json.loads(response['body'])
+
+
+@pytest.fixture(scope="session")
+def response_body():
+    """Parser for Lambda response bodies, shared by the handler test modules."""
+    return parse_response_body
+
+
+@pytest.fixture(scope="module")
 def aws_credentials():
     """Mocked AWS credentials for moto."""
     os.environ["AWS_ACCESS_KEY_ID"] = "testing"
@@ -37,99 +115,72 @@ def aws_credentials():
     os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
 
 
-@pytest.fixture
-def mock_dynamodb(aws_credentials):
-    """Create mocked DynamoDB table for incident storage."""
-    with mock_aws():
-        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
-        
-        # Create the incidents table matching Terraform schema
-        table = dynamodb.create_table(
-            TableName="test-mfa-incidents",
-            KeySchema=[
-                {"AttributeName": "incident_id", "KeyType": "HASH"}
-            ],
-            AttributeDefinitions=[
-                {"AttributeName": "incident_id", "AttributeType": "S"},
-                {"AttributeName": "scenario", "AttributeType": "S"},
-                {"AttributeName": "created_at", "AttributeType": "N"}
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    "IndexName": "scenario-created-index",
-                    "KeySchema": [
-                        {"AttributeName": "scenario", "KeyType": "HASH"},
-                        {"AttributeName": "created_at", "KeyType": "RANGE"}
-                    ],
-                    "Projection": {"ProjectionType": "ALL"}
-                }
-            ],
-            BillingMode="PAY_PER_REQUEST"
-        )
-        
-        # Wait for table to be active
-        table.meta.client.get_waiter("table_exists").wait(TableName="test-mfa-incidents")
-        
-        yield dynamodb
-
+def create_incidents_table(dynamodb):
+    """Create the incidents table matching Terraform schema."""
+    table = dynamodb.create_table(
+        TableName="test-mfa-incidents",
+        KeySchema=[
+            {"AttributeName": "incident_id", "KeyType": "HASH"}
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "incident_id", "AttributeType": "S"},
+            {"AttributeName": "scenario", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "N"},
+            {"AttributeName": "gsi_pk", "AttributeType": "S"},
+            {"AttributeName": "remediation_ready_at", "AttributeType": "N"}
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": "scenario-created-index",
+                "KeySchema": [
+                    {"AttributeName": "scenario", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"}
+                ],
+                "Projection": {"ProjectionType": "ALL"}
+            },
+            {
+                "IndexName": "remediation-ready-index",
+                "KeySchema": [
+                    {"AttributeName": "gsi_pk", "KeyType": "HASH"},
+                    {"AttributeName": "remediation_ready_at", "KeyType": "RANGE"}
+                ],
+                "Projection": {"ProjectionType": "ALL"}
+            }
+        ],
+        BillingMode="PAY_PER_REQUEST"
+    )
+    
+    # Wait for table to be active
+    table.meta.client.get_waiter("table_exists").wait(TableName="test-mfa-incidents")
+    return table
 
-@pytest.fixture
-def mock_sns(aws_credentials):
-    """Create mocked SNS topic for alerts."""
-    with mock_aws():
-        sns = boto3.client("sns", region_name="us-east-1")
-        
-        # Create the alerts topic
-        response = sns.create_topic(Name="test-alerts")
-        topic_arn = response["TopicArn"]
-        
-        yield sns, topic_arn
 
+def clear_table(table):
+    """Delete every item so each test starts from an empty table."""
+    scan_kwargs = {"ProjectionExpression": "incident_id"}
+    with table.batch_writer() as writer:
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response["Items"]:
+                writer.delete_item(Key={"incident_id": item["incident_id"]})
+            if "LastEvaluatedKey" not in response:
+                break
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
 
-@pytest.fixture
-def mock_cloudwatch(aws_credentials):
-    """Create mocked CloudWatch for metrics."""
-    with mock_aws():
-        cloudwatch = boto3.client("cloudwatch", region_name="us-east-1")
-        yield cloudwatch
 
+# moto's mock_aws patching and table creation run once per test module;
+# the function-scoped fixtures below only reset state between tests.
 
-@pytest.fixture
-def mock_all_aws(aws_credentials):
-    """
-    Mock all AWS services needed by the handler.
-    Use this for integration-style tests.
-    """
+@pytest.fixture(scope="module")
+def aws_module_mocks(aws_credentials):
+    """Start moto and create the incidents table and alerts topic once per module."""
     with mock_aws():
-        # DynamoDB
         dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
-        table = dynamodb.create_table(
-            TableName="test-mfa-incidents",
-            KeySchema=[
-                {"AttributeName": "incident_id", "KeyType": "HASH"}
-            ],
-            AttributeDefinitions=[
-                {"AttributeName": "incident_id", "AttributeType": "S"},
-                {"AttributeName": "scenario", "AttributeType": "S"},
-                {"AttributeName": "created_at", "AttributeType": "N"}
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    "IndexName": "scenario-created-index",
-                    "KeySchema": [
-                        {"AttributeName": "scenario", "KeyType": "HASH"},
-                        {"AttributeName": "created_at", "KeyType": "RANGE"}
-                    ],
-                    "Projection": {"ProjectionType": "ALL"}
-                }
-            ],
-            BillingMode="PAY_PER_REQUEST"
-        )
-        table.meta.client.get_waiter("table_exists").wait(TableName="test-mfa-incidents")
+        table = create_incidents_table(dynamodb)
         
         # SNS
         sns = boto3.client("sns", region_name="us-east-1")
-        sns.create_topic(Name="test-alerts")
+        topic_arn = sns.create_topic(Name="test-alerts")["TopicArn"]
         
         # CloudWatch
         cloudwatch = boto3.client("cloudwatch", region_name="us-east-1")
@@ -137,267 +188,348 @@ def mock_all_aws(aws_credentials):
         yield {
             "dynamodb": dynamodb,
             "sns": sns,
+            "topic_arn": topic_arn,
             "cloudwatch": cloudwatch,
             "table": table
         }
 
 
+@pytest.fixture
+def reset_aws_state(aws_module_mocks):
+    """Empty the shared incidents table before each test that uses it."""
+    clear_table(aws_module_mocks["table"])
+    return aws_module_mocks
+
+
+@pytest.fixture
+def mock_dynamodb(reset_aws_state):
+    """Mocked DynamoDB with an empty incidents table."""
+    return reset_aws_state["dynamodb"]
+
+
+@pytest.fixture
+def mock_sns(reset_aws_state):
+    """Mocked SNS topic for alerts."""
+    return reset_aws_state["sns"], reset_aws_state["topic_arn"]
+
+
+@pytest.fixture
+def mock_cloudwatch(reset_aws_state):
+    """Mocked CloudWatch for metrics."""
+    return reset_aws_state["cloudwatch"]
+
+
+@pytest.fixture
+def mock_all_aws(reset_aws_state):
+    """
+    Mock all AWS services needed by the handler.
+    Use this for integration-style tests.
+    """
+    return {
+        "dynamodb": reset_aws_state["dynamodb"],
+        "sns": reset_aws_state["sns"],
+        "cloudwatch": reset_aws_state["cloudwatch"],
+        "table": reset_aws_state["table"]
+    }
+
+
 # =============================================================================
 # CloudTrail Event Fixtures - Realistic test data
 # =============================================================================
 
-@pytest.fixture
+# Event payloads are built once at import time and shared by session-scoped
+# fixtures. Tests must not mutate them; derive variants with {**event, ...}
+# or copy.deepcopy instead.
+
+_CLOUDTRAIL_CONSOLE_LOGIN_SUCCESS_NO_MFA = {
+    "detail-type": "AWS Console Sign In via CloudTrail",
+    "source": "aws.signin",
+    "detail": {
+        "eventVersion": "1.08",
+        "eventTime": "2025-02-18T14:32:11Z",
+        "eventSource": "signin.amazonaws.com",
+        "eventName": "ConsoleLogin",
+        "awsRegion": "us-east-1",
+        "sourceIPAddress": "203.0.113.42",
+        "userAgent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+        "responseElements": {
+            "ConsoleLogin": "Success"
+        },
+        "additionalEventData": {
+            "MFAUsed": "No",
+            "LoginTo": "https://console.aws.amazon.com/console/home?region=us-east-1",
+            "MobileVersion": "No"
+        },
+        "userIdentity": {
+            "type": "IAMUser",
+            "userName": "finance-analyst-01",
+            "accountId": "123456789012",
+            "principalId": "AIDAEXAMPLE123456789",
+            "arn": "arn:aws:iam::123456789012:user/finance-analyst-01"
+        },
+        "eventID": "a1b2c3d4-5678-90ab-cdef-EXAMPLE11111",
+        "readOnly": False,
+        "eventType": "AwsConsoleSignIn",
+        "managementEvent": True,
+        "recipientAccountId": "123456789012"
+    }
+}
+
+
+@pytest.fixture(scope="session")
 def cloudtrail_console_login_success_no_mfa():
     """
     Realistic CloudTrail event: Successful console login WITHOUT MFA.
     This is a security concern - user logged in but MFA was not enforced.
     """
-    return {
-        "detail-type": "AWS Console Sign In via CloudTrail",
-        "source": "aws.signin",
-        "detail": {
-            "eventVersion": "1.08",
-            "eventTime": "2025-02-18T14:32:11Z",
-            "eventSource": "signin.amazonaws.com",
-            "eventName": "ConsoleLogin",
-            "awsRegion": "us-east-1",
-            "sourceIPAddress": "203.0.113.42",
-            "userAgent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            "responseElements": {
-                "ConsoleLogin": "Success"
-            },
-            "additionalEventData": {
-                "MFAUsed": "No",
-                "LoginTo": "https://console.aws.amazon.com/console/home?region=us-east-1",
-                "MobileVersion": "No"
-            },
-            "userIdentity": {
-                "type": "IAMUser",
-                "userName": "finance-analyst-01",
-                "accountId": "123456789012",
-                "principalId": "AIDAEXAMPLE123456789",
-                "arn": "arn:aws:iam::123456789012:user/finance-analyst-01"
-            },
-            "eventID": "a1b2c3d4-5678-90ab-cdef-EXAMPLE11111",
-            "readOnly": False,
-            "eventType": "AwsConsoleSignIn",
-            "managementEvent": True,
-            "recipientAccountId": "123456789012"
-        }
+    return _CLOUDTRAIL_CONSOLE_LOGIN_SUCCESS_NO_MFA
+
+
+_CLOUDTRAIL_CONSOLE_LOGIN_FAILED_NO_MFA = {
+    "detail-type": "AWS Console Sign In via CloudTrail",
+    "source": "aws.signin",
+    "detail": {
+        "eventVersion": "1.08",
+        "eventTime": "2025-02-18T14:30:45Z",
+        "eventSource": "signin.amazonaws.com",
+        "eventName": "ConsoleLogin",
+        "awsRegion": "us-east-1",
+        "sourceIPAddress": "203.0.113.42",
+        "userAgent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+        "errorMessage": "Failed authentication",
+        "responseElements": {
+            "ConsoleLogin": "Failure"
+        },
+        "additionalEventData": {
+            "MFAUsed": "No",
+            "LoginTo": "https://console.aws.amazon.com/console/home?region=us-east-1",
+            "MobileVersion": "No"
+        },
+        "userIdentity": {
+            "type": "IAMUser",
+            "userName": "dev-engineer-02",
+            "accountId": "123456789012",
+            "principalId": "AIDAEXAMPLE123456790",
+            "arn": "arn:aws:iam::123456789012:user/dev-engineer-02"
+        },
+        "eventID": "a1b2c3d4-5678-90ab-cdef-EXAMPLE22222",
+        "readOnly": False,
+        "eventType": "AwsConsoleSignIn",
+        "managementEvent": True,
+        "recipientAccountId": "123456789012"
     }
+}
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def cloudtrail_console_login_failed_no_mfa():
     """
     Realistic CloudTrail event: Failed console login with MFA issue.
     User attempted login but authentication failed.
     """
-    return {
-        "detail-type": "AWS Console Sign In via CloudTrail",
-        "source": "aws.signin",
-        "detail": {
-            "eventVersion": "1.08",
-            "eventTime": "2025-02-18T14:30:45Z",
-            "eventSource": "signin.amazonaws.com",
-            "eventName": "ConsoleLogin",
-            "awsRegion": "us-east-1",
-            "sourceIPAddress": "203.0.113.42",
-            "userAgent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-            "errorMessage": "Failed authentication",
-            "responseElements": {
-                "ConsoleLogin": "Failure"
-            },
-            "additionalEventData": {
-                "MFAUsed": "No",
-                "LoginTo": "https://console.aws.amazon.com/console/home?region=us-east-1",
-                "MobileVersion": "No"
-            },
-            "userIdentity": {
-                "type": "IAMUser",
-                "userName": "dev-engineer-02",
-                "accountId": "123456789012",
-                "principalId": "AIDAEXAMPLE123456790",
-                "arn": "arn:aws:iam::123456789012:user/dev-engineer-02"
-            },
-            "eventID": "a1b2c3d4-5678-90ab-cdef-EXAMPLE22222",
-            "readOnly": False,
-            "eventType": "AwsConsoleSignIn",
-            "managementEvent": True,
-            "recipientAccountId": "123456789012"
-        }
+    return _CLOUDTRAIL_CONSOLE_LOGIN_FAILED_NO_MFA
+
+
+_CLOUDTRAIL_CONSOLE_LOGIN_SUCCESS_WITH_MFA = {
+    "detail-type": "AWS Console Sign In via CloudTrail",
+    "source": "aws.signin",
+    "detail": {
+        "eventVersion": "1.08",
+        "eventTime": "2025-02-18T14:35:00Z",
+        "eventSource": "signin.amazonaws.com",
+        "eventName": "ConsoleLogin",
+        "awsRegion": "us-east-1",
+        "sourceIPAddress": "198.51.100.10",
+        "userAgent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+        "responseElements": {
+            "ConsoleLogin": "Success"
+        },
+        "additionalEventData": {
+            "MFAUsed": "Yes",
+            "LoginTo": "https://console.aws.amazon.com/console/home?region=us-east-1",
+            "MobileVersion": "No"
+        },
+        "userIdentity": {
+            "type": "IAMUser",
+            "userName": "security-admin-01",
+            "accountId": "123456789012",
+            "principalId": "AIDAEXAMPLE123456791",
+            "arn": "arn:aws:iam::123456789012:user/security-admin-01"
+        },
+        "eventID": "a1b2c3d4-5678-90ab-cdef-EXAMPLE33333",
+        "readOnly": False,
+        "eventType": "AwsConsoleSignIn",
+        "managementEvent": True,
+        "recipientAccountId": "123456789012"
     }
+}
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def cloudtrail_console_login_success_with_mfa():
     """
     Realistic CloudTrail event: Successful console login WITH MFA.
     This should NOT trigger an incident - it's the expected behavior.
     """
-    return {
-        "detail-type": "AWS Console Sign In via CloudTrail",
-        "source": "aws.signin",
-        "detail": {
-            "eventVersion": "1.08",
-            "eventTime": "2025-02-18T14:35:00Z",
-            "eventSource": "signin.amazonaws.com",
-            "eventName": "ConsoleLogin",
-            "awsRegion": "us-east-1",
-            "sourceIPAddress": "198.51.100.10",
-            "userAgent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-            "responseElements": {
-                "ConsoleLogin": "Success"
-            },
-            "additionalEventData": {
-                "MFAUsed": "Yes",
-                "LoginTo": "https://console.aws.amazon.com/console/home?region=us-east-1",
-                "MobileVersion": "No"
-            },
-            "userIdentity": {
-                "type": "IAMUser",
-                "userName": "security-admin-01",
-                "accountId": "123456789012",
-                "principalId": "AIDAEXAMPLE123456791",
-                "arn": "arn:aws:iam::123456789012:user/security-admin-01"
-            },
-            "eventID": "a1b2c3d4-5678-90ab-cdef-EXAMPLE33333",
-            "readOnly": False,
-            "eventType": "AwsConsoleSignIn",
-            "managementEvent": True,
-            "recipientAccountId": "123456789012"
-        }
+    return _CLOUDTRAIL_CONSOLE_LOGIN_SUCCESS_WITH_MFA
+
+
+_CLOUDTRAIL_ACCESS_DENIED_WITH_MFA = {
+    "detail-type": "AWS API Call via CloudTrail",
+    "source": "aws.s3",
+    "detail": {
+        "eventVersion": "1.09",
+        "eventTime": "2025-02-18T15:00:00Z",
+        "eventSource": "s3.amazonaws.com",
+        "eventName": "GetObject",
+        "awsRegion": "us-east-1",
+        "sourceIPAddress": "203.0.113.55",
+        "userAgent": "aws-cli/2.13.0 Python/3.11.4",
+        "errorCode": "AccessDenied",
+        "errorMessage": "Access Denied",
+        "requestParameters": {
+            "bucketName": "sensitive-financial-data",
+            "key": "reports/q4-2024.pdf"
+        },
+        "userIdentity": {
+            "type": "IAMUser",
+            "userName": "finance-analyst-01",
+            "accountId": "123456789012",
+            "principalId": "AIDAEXAMPLE123456789",
+            "arn": "arn:aws:iam::123456789012:user/finance-analyst-01",
+            "sessionContext": {
+                "attributes": {
+                    "mfaAuthenticated": "true",
+                    "creationDate": "2025-02-18T14:32:11Z"
+                }
+            }
+        },
+        "eventID": "a1b2c3d4-5678-90ab-cdef-EXAMPLE44444",
+        "readOnly": True,
+        "eventType": "AwsApiCall",
+        "managementEvent": False,
+        "recipientAccountId": "123456789012"
     }
+}
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def cloudtrail_access_denied_with_mfa():
     """
     Realistic CloudTrail event: AccessDenied despite having MFA session.
     This indicates a policy mismatch - user has MFA but policy denies.
     """
-    return {
-        "detail-type": "AWS API Call via CloudTrail",
-        "source": "aws.s3",
-        "detail": {
-            "eventVersion": "1.09",
-            "eventTime": "2025-02-18T15:00:00Z",
-            "eventSource": "s3.amazonaws.com",
-            "eventName": "GetObject",
-            "awsRegion": "us-east-1",
-            "sourceIPAddress": "203.0.113.55",
-            "userAgent": "aws-cli/2.13.0 Python/3.11.4",
-            "errorCode": "AccessDenied",
-            "errorMessage": "Access Denied",
-            "requestParameters": {
-                "bucketName": "sensitive-financial-data",
-                "key": "reports/q4-2024.pdf"
-            },
-            "userIdentity": {
-                "type": "IAMUser",
-                "userName": "finance-analyst-01",
-                "accountId": "123456789012",
-                "principalId": "AIDAEXAMPLE123456789",
-                "arn": "arn:aws:iam::123456789012:user/finance-analyst-01",
-                "sessionContext": {
-                    "attributes": {
-                        "mfaAuthenticated": "true",
-                        "creationDate": "2025-02-18T14:32:11Z"
-                    }
+    return _CLOUDTRAIL_ACCESS_DENIED_WITH_MFA
+
+
+_CLOUDTRAIL_ACCESS_DENIED_WITHOUT_MFA = {
+    "detail-type": "AWS API Call via CloudTrail",
+    "source": "aws.s3",
+    "detail": {
+        "eventVersion": "1.09",
+        "eventTime": "2025-02-18T15:05:00Z",
+        "eventSource": "s3.amazonaws.com",
+        "eventName": "GetObject",
+        "awsRegion": "us-east-1",
+        "sourceIPAddress": "203.0.113.60",
+        "userAgent": "aws-cli/2.13.0 Python/3.11.4",
+        "errorCode": "AccessDenied",
+        "errorMessage": "Access Denied",
+        "requestParameters": {
+            "bucketName": "sensitive-financial-data",
+            "key": "reports/q4-2024.pdf"
+        },
+        "userIdentity": {
+            "type": "IAMUser",
+            "userName": "contractor-01",
+            "accountId": "123456789012",
+            "principalId": "AIDAEXAMPLE123456792",
+            "arn": "arn:aws:iam::123456789012:user/contractor-01",
+            "sessionContext": {
+                "attributes": {
+                    "mfaAuthenticated": "false",
+                    "creationDate": "2025-02-18T15:00:00Z"
                 }
-            },
-            "eventID": "a1b2c3d4-5678-90ab-cdef-EXAMPLE44444",
-            "readOnly": True,
-            "eventType": "AwsApiCall",
-            "managementEvent": False,
-            "recipientAccountId": "123456789012"
-        }
+            }
+        },
+        "eventID": "a1b2c3d4-5678-90ab-cdef-EXAMPLE55555",
+        "readOnly": True,
+        "eventType": "AwsApiCall",
+        "managementEvent": False,
+        "recipientAccountId": "123456789012"
     }
+}
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def cloudtrail_access_denied_without_mfa():
     """
     Realistic CloudTrail event: AccessDenied without MFA session.
     This should NOT trigger policy_mismatch - expected denial.
     """
-    return {
-        "detail-type": "AWS API Call via CloudTrail",
-        "source": "aws.s3",
-        "detail": {
-            "eventVersion": "1.09",
-            "eventTime": "2025-02-18T15:05:00Z",
-            "eventSource": "s3.amazonaws.com",
-            "eventName": "GetObject",
-            "awsRegion": "us-east-1",
-            "sourceIPAddress": "203.0.113.60",
-            "userAgent": "aws-cli/2.13.0 Python/3.11.4",
-            "errorCode": "AccessDenied",
-            "errorMessage": "Access Denied",
-            "requestParameters": {
-                "bucketName": "sensitive-financial-data",
-                "key": "reports/q4-2024.pdf"
-            },
-            "userIdentity": {
-                "type": "IAMUser",
-                "userName": "contractor-01",
-                "accountId": "123456789012",
-                "principalId": "AIDAEXAMPLE123456792",
-                "arn": "arn:aws:iam::123456789012:user/contractor-01",
-                "sessionContext": {
-                    "attributes": {
-                        "mfaAuthenticated": "false",
-                        "creationDate": "2025-02-18T15:00:00Z"
-                    }
-                }
-            },
-            "eventID": "a1b2c3d4-5678-90ab-cdef-EXAMPLE55555",
-            "readOnly": True,
-            "eventType": "AwsApiCall",
-            "managementEvent": False,
-            "recipientAccountId": "123456789012"
-        }
-    }
+    return _CLOUDTRAIL_ACCESS_DENIED_WITHOUT_MFA
 
 
 # =============================================================================
 # Rate Limiting Burst Fixtures
 # =============================================================================
 
-@pytest.fixture
+_CLOUDTRAIL_BURST_BASE_EVENT = {
+    "detail-type": "AWS Console Sign In via CloudTrail",
+    "source": "aws.signin",
+    "detail": {
+        "eventVersion": "1.08",
+        "eventSource": "signin.amazonaws.com",
+        "eventName": "ConsoleLogin",
+        "awsRegion": "us-east-1",
+        "sourceIPAddress": "203.0.113.100",
+        "userAgent": "Mozilla/5.0",
+        "errorMessage": "Failed authentication",
+        "responseElements": {"ConsoleLogin": "Failure"},
+        "additionalEventData": {"MFAUsed": "No"},
+        "userIdentity": {
+            "type": "IAMUser",
+            "userName": "brute-force-target",
+            "accountId": "123456789012"
+        }
+    }
+}
+
+# One failure every 10 seconds, from 14:30:10 to 14:30:50
+_BURST_TIMES = (
+    "2025-02-18T14:30:10Z",
+    "2025-02-18T14:30:20Z",
+    "2025-02-18T14:30:30Z",
+    "2025-02-18T14:30:40Z",
+    "2025-02-18T14:30:50Z"
+)
+_BURST_IDS = tuple(f"burst-event-{i + 1}" for i in range(len(_BURST_TIMES)))
+
+# Tuple so tests cannot append to or reorder the shared burst
+_CLOUDTRAIL_BURST_5_FAILURES_60S = tuple(
+    {
+        **_CLOUDTRAIL_BURST_BASE_EVENT,
+        "detail": {
+            **_CLOUDTRAIL_BURST_BASE_EVENT["detail"],
+            "eventTime": event_time,
+            "eventID": event_id
+        }
+    }
+    for event_time, event_id in zip(_BURST_TIMES, _BURST_IDS)
+)
+
+
+@pytest.fixture(params=_CLOUDTRAIL_BURST_5_FAILURES_60S, ids=_BURST_IDS)
+def burst_event(request):
+    """Each event of the shared burst in turn; tests using it run once per event."""
+    return request.param
+
+
+@pytest.fixture(scope="session")
 def cloudtrail_burst_5_failures_60s():
     """
-    Generate 5 failed login events within 60 seconds.
+    5 failed login events within 60 seconds.
     This represents a rate-limiting trigger pattern.
     """
-    base_event = {
-        "detail-type": "AWS Console Sign In via CloudTrail",
-        "source": "aws.signin",
-        "detail": {
-            "eventVersion": "1.08",
-            "eventSource": "signin.amazonaws.com",
-            "eventName": "ConsoleLogin",
-            "awsRegion": "us-east-1",
-            "sourceIPAddress": "203.0.113.100",
-            "userAgent": "Mozilla/5.0",
-            "errorMessage": "Failed authentication",
-            "responseElements": {"ConsoleLogin": "Failure"},
-            "additionalEventData": {"MFAUsed": "No"},
-            "userIdentity": {
-                "type": "IAMUser",
-                "userName": "brute-force-target",
-                "accountId": "123456789012"
-            }
-        }
-    }
-    
-    events = []
-    for i in range(5):
-        event = base_event.copy()
-        event["detail"] = base_event["detail"].copy()
-        event["detail"]["eventTime"] = f"2025-02-18T14:30:{10 + i * 10:02d}Z"
-        event["detail"]["eventID"] = f"burst-event-{i+1}"
-        events.append(event)
-    
-    return events
+    return _CLOUDTRAIL_BURST_5_FAILURES_60S
 
@@ -0,0 +1,309 @@
+"""
+Unit Tests for MFA Incident Responder Handler
+
+What we ARE testing:
+- Eligibility lookup (OPEN rate_limiting incidents past cooldown)
+- Return value structure
+
+What we are NOT testing:
+- AWS service availability
+- SNS notification delivery
+- Real EventBridge schedule flow
+
+The signal: "Given the incidents table, does the responder pick the right ones?"
+"""
+
+import json
+import time
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture(autouse=True)
+def clear_recent_resolved(responder):
+    """The warm-container cache is module state; start each test empty."""
+    responder.RECENT_RESOLVED.clear()
+    yield
+    responder.RECENT_RESOLVED.clear()
+
+
+def make_incident(incident_id, scenario='rate_limiting', status='OPEN', age_seconds=400, cooldown=300):
+    """Build a minimal incident item as written by the simulator."""
+    created_at = int(time.time()) - age_seconds
+    incident = {
+        'incident_id': incident_id,
+        'scenario': scenario,
+        'severity': 'HIGH',
+        'status': status,
+        'user': 'responder-test-user',
+        'created_at': created_at,
+        'cooldown_seconds': cooldown
+    }
+    if scenario == 'rate_limiting' and status == 'OPEN':
+        incident['gsi_pk'] = 'OPEN_RATE'
+        incident['remediation_ready_at'] = created_at + cooldown
+    return incident
+
+
+# =============================================================================
+# Test Classes
+# =============================================================================
+
+class TestEligibility:
+    """Test selection of incidents eligible for assisted remediation."""
+
+    def test_selects_open_rate_limiting_past_cooldown(self, responder, mock_all_aws):
+        """Only OPEN rate_limiting incidents past cooldown are eligible."""
+        table = mock_all_aws['table']
+        table.put_item(Item=make_incident('RATE-LIMIT-ELIGIBLE'))
+        table.put_item(Item=make_incident('RATE-LIMIT-FRESH', age_seconds=60))
+        table.put_item(Item=make_incident('RATE-LIMIT-DONE', status='RESOLVED'))
+        table.put_item(Item=make_incident('POLICY-OPEN', scenario='policy_mismatch'))
+
+        eligible = responder.get_eligible_incidents(int(time.time()))
+
+        assert [item['incident_id'] for item in eligible] == ['RATE-LIMIT-ELIGIBLE']
+
+    def test_reads_only_projected_attributes(self, responder, mock_all_aws):
+        """Large attributes are not returned by the eligibility query."""
+        table = mock_all_aws['table']
+        item = make_incident('RATE-LIMIT-PROJECTED')
+        item['description'] = 'x' * 1024
+        item['detection_signal'] = {'pattern': 'Multiple failed attempts from same user and IP'}
+        table.put_item(Item=item)
+
+        eligible = responder.get_eligible_incidents(int(time.time()))
+
+        assert len(eligible) == 1
+        assert set(eligible[0]) == {'incident_id', 'created_at', 'user', 'severity', 'scenario'}
+
+    def test_respects_per_incident_cooldown(self, responder, mock_all_aws):
+        """Incidents with a longer cooldown stay ineligible until it elapses."""
+        table = mock_all_aws['table']
+        table.put_item(Item=make_incident('RATE-LIMIT-LONG', age_seconds=400, cooldown=900))
+
+        assert responder.get_eligible_incidents(int(time.time())) == []
+
+    def test_follows_query_pagination(self, responder):
+        """All pages of the index query are consumed."""
+        pages = [
+            {'Items': [make_incident('RATE-LIMIT-PAGE1')], 'LastEvaluatedKey': {'incident_id': 'RATE-LIMIT-PAGE1'}},
+            {'Items': [make_incident('RATE-LIMIT-PAGE2')]}
+        ]
+
+        with patch.object(responder, 'get_table') as mock_get_table:
+            mock_query = mock_get_table.return_value.query
+            mock_query.side_effect = pages
+
+            eligible = responder.get_eligible_incidents(int(time.time()))
+
+        assert [item['incident_id'] for item in eligible] == ['RATE-LIMIT-PAGE1', 'RATE-LIMIT-PAGE2']
+        assert mock_query.call_count == 2
+        assert mock_query.call_args_list[1].kwargs['ExclusiveStartKey'] == {'incident_id': 'RATE-LIMIT-PAGE1'}
+        assert mock_query.call_args_list[0].kwargs['IndexName'] == 'remediation-ready-index'
+
+
+class TestResponderHandler:
+    """Test the responder entry point."""
+
+    def test_no_eligible_incidents(self, responder, response_body, mock_all_aws):
+        """Empty table returns processed=0."""
+        response = responder.lambda_handler({}, None)
+
+        assert response['statusCode'] == 200
+        body = response_body(response)
+        assert body['processed'] == 0
+
+    def test_resolves_eligible_incident(self, responder, response_body, mock_all_aws):
+        """Eligible incidents are marked RESOLVED in DynamoDB."""
+        table = mock_all_aws['table']
+        table.put_item(Item=make_incident('RATE-LIMIT-RESOLVE'))
+
+        response = responder.lambda_handler({}, None)
+
+        body = response_body(response)
+        assert body['processed'] == 1
+        assert body['total_eligible'] == 1
+
+        item = table.get_item(Key={'incident_id': 'RATE-LIMIT-RESOLVE'})['Item']
+        assert item['status'] == 'RESOLVED'
+        assert item['remediation_type'] == 'assisted_auto'
+        assert 'gsi_pk' not in item  # Dropped from the sparse eligibility index
+
+
+class TestBatchedUpdates:
+    """Test transactional batching of RESOLVED updates."""
+
+    def test_updates_are_chunked_per_transaction_limit(self, responder):
+        """More than 100 resolutions are split across TransactWriteItems calls."""
+        resolutions = [(make_incident(f'RATE-LIMIT-{i:03d}'), 400) for i in range(150)]
+
+        with patch.object(responder, 'get_table') as mock_get_table:
+            mock_transact = mock_get_table.return_value.meta.client.transact_write_items
+
+            committed = responder.update_incidents_batch(resolutions, 'RESOLVED', '2025-02-18T15:00:00+00:00')
+
+        assert len(committed) == 150
+        assert mock_transact.call_count == 2
+        chunk_sizes = [len(c.kwargs['TransactItems']) for c in mock_transact.call_args_list]
+        assert chunk_sizes == [100, 50]
+
+    def test_failed_chunk_is_not_reported_committed(self, responder):
+        """A rejected transaction leaves its incidents out of the result."""
+        resolutions = [(make_incident(f'RATE-LIMIT-{i:03d}'), 400) for i in range(120)]
+
+        with patch.object(responder, 'get_table') as mock_get_table:
+            mock_transact = mock_get_table.return_value.meta.client.transact_write_items
+            mock_transact.side_effect = [None, Exception('TransactionCanceledException')]
+
+            committed = responder.update_incidents_batch(resolutions, 'RESOLVED', '2025-02-18T15:00:00+00:00')
+
+        assert len(committed) == 100
+
+
+class TestBatchedNotifications:
+    """Test SNS PublishBatch fan-out for resolution notifications."""
+
+    def test_notifications_are_chunked_per_batch_limit(self, responder):
+        """Resolutions are published 10 entries per PublishBatch call."""
+        resolutions = [(make_incident(f'RATE-LIMIT-{i:03d}'), 400) for i in range(25)]
+
+        with patch.object(responder, 'get_sns') as mock_get_sns:
+            mock_sns = mock_get_sns.return_value
+            mock_sns.publish_batch.return_value = {'Successful': [], 'Failed': []}
+
+            responder.send_resolution_notifications_batch(resolutions, '2025-02-18T15:00:00+00:00')
+
+        assert mock_sns.publish_batch.call_count == 3
+        chunk_sizes = [
+            len(c.kwargs['PublishBatchRequestEntries'])
+            for c in mock_sns.publish_batch.call_args_list
+        ]
+        assert chunk_sizes == [10, 10, 5]
+
+        first_entry = mock_sns.publish_batch.call_args_list[0].kwargs['PublishBatchRequestEntries'][0]
+        assert first_entry['Id'] == 'RATE-LIMIT-000'
+        assert json.loads(first_entry['Message'])['event'] == 'INCIDENT_RESOLVED'
+
+
+class TestProcessRemediations:
+    """Test the fan-out of per-incident side effects."""
+
+    def test_side_effects_run_only_for_committed_incidents(self, responder):
+        """Notifications and metrics follow the committed DynamoDB updates."""
+        incidents = [make_incident(f'RATE-LIMIT-{i:03d}') for i in range(3)]
+
+        with patch.object(responder, 'update_incidents_batch') as mock_update, \
+             patch.object(responder, 'send_resolution_notifications_batch') as mock_notify, \
+             patch.object(responder, 'emit_resolution_metrics') as mock_metrics:
+
+            mock_update.side_effect = lambda resolutions, *args, **kwargs: resolutions[:2]
+
+            resolved = responder.process_remediations(incidents, int(time.time()), '2025-02-18T15:00:00+00:00')
+
+        assert len(resolved) == 2
+        notified = mock_notify.call_args.args[0]
+        assert [incident['incident_id'] for incident, _ in notified] == ['RATE-LIMIT-000', 'RATE-LIMIT-001']
+        mock_metrics.assert_called_once_with(notified)
+
+    def test_small_run_is_processed_without_thread_pool(self, responder):
+        """A run that fits one request per call does not build an executor."""
+        incidents = [make_incident('RATE-LIMIT-000')]
+
+        with patch.object(responder, 'ThreadPoolExecutor') as mock_executor, \
+             patch.object(responder, 'update_incidents_batch') as mock_update, \
+             patch.object(responder, 'send_resolution_notifications_batch') as mock_notify, \
+             patch.object(responder, 'emit_resolution_metrics'):
+
+            mock_update.side_effect = lambda resolutions, *args, **kwargs: resolutions
+
+            resolved = responder.process_remediations(incidents, int(time.time()), '2025-02-18T15:00:00+00:00')
+
+        mock_executor.assert_not_called()
+        assert mock_update.call_args.kwargs.get('executor') is None
+        mock_notify.assert_called_once_with(resolved, '2025-02-18T15:00:00+00:00')
+
+    def test_large_run_fans_out_on_thread_pool(self, responder):
+        """Past INLINE_REMEDIATIONS_MAX the updates go through an executor."""
+        incidents = [make_incident(f'RATE-LIMIT-{i:03d}') for i in range(responder.INLINE_REMEDIATIONS_MAX + 1)]
+
+        with patch.object(responder, 'update_incidents_batch') as mock_update, \
+             patch.object(responder, 'send_resolution_notifications_batch'), \
+             patch.object(responder, 'emit_resolution_metrics'):
+
+            mock_update.side_effect = lambda resolutions, *args, **kwargs: resolutions
+
+            responder.process_remediations(incidents, int(time.time()), '2025-02-18T15:00:00+00:00')
+
+        assert mock_update.call_args.kwargs['executor'] is not None
+
+    def test_recently_resolved_incidents_are_skipped(self, responder):
+        """A warm container does not resolve the same incident twice."""
+        incidents = [make_incident(f'RATE-LIMIT-{i:03d}') for i in range(2)]
+
+        with patch.object(responder, 'update_incidents_batch') as mock_update, \
+             patch.object(responder, 'send_resolution_notifications_batch'), \
+             patch.object(responder, 'emit_resolution_metrics'):
+
+            mock_update.side_effect = lambda resolutions, *args, **kwargs: resolutions
+
+            first = responder.process_remediations(incidents, int(time.time()), '2025-02-18T15:00:00+00:00')
+            second = responder.process_remediations(incidents, int(time.time()), '2025-02-18T15:05:00+00:00')
+
+        assert len(first) == 2
+        assert second == []
+        assert responder.RECENT_RESOLVED['RATE-LIMIT-000'] == '2025-02-18T15:00:00+00:00'
+
+    def test_recently_resolved_cache_is_bounded(self, responder):
+        """The oldest entries are evicted once the cap is reached."""
+        resolutions = [(make_incident(f'RATE-LIMIT-{i:04d}'), 400) for i in range(responder.RECENT_RESOLVED_MAX + 5)]
+
+        responder.remember_resolved(resolutions, '2025-02-18T15:00:00+00:00')
+
+        assert len(responder.RECENT_RESOLVED) == responder.RECENT_RESOLVED_MAX
+        assert 'RATE-LIMIT-0000' not in responder.RECENT_RESOLVED
+        assert f'RATE-LIMIT-{responder.RECENT_RESOLVED_MAX + 4:04d}' in responder.RECENT_RESOLVED
+
+
+class TestAggregatedMetrics:
+    """Test Embedded Metric Format output for resolution metrics."""
+
+    def test_single_emf_document_per_scenario(self, responder, capsys):
+        """All resolutions of a scenario share one EMF log line."""
+        resolutions = [(make_incident(f'RATE-LIMIT-{i:03d}'), 300 + i) for i in range(5)]
+
+        responder.emit_resolution_metrics(resolutions)
+
+        documents = [
+            json.loads(line) for line in capsys.readouterr().out.splitlines()
+            if line.startswith('{')
+        ]
+        assert len(documents) == 1
+
+        document = documents[0]
+        metrics = document['_aws']['CloudWatchMetrics'][0]
+        assert metrics['Namespace'] == 'MFAIncidentSimulator'
+        assert ['Environment'] in metrics['Dimensions']
+        assert document['Scenario'] == 'rate_limiting'
+        assert document['IncidentResolved'] == 5
+        assert document['ResolutionTimeSeconds'] == [300, 301, 302, 303, 304]
+
+
+class TestFormatDuration:
+    """Test the human-readable resolution time in notifications."""
+
+    def test_format_duration(self, responder):
+        """Seconds, minutes and hours boundaries render as expected."""
+        cases = [
+            (0, '0s'),
+            (59, '59s'),
+            (60, '1m 0s'),
+            (305, '5m 5s'),
+            (3599, '59m 59s'),
+            (3600, '1h 0m'),
+            (7380, '2h 3m')
+        ]
+
+        for seconds, expected in cases:
+            assert responder.format_duration(seconds) == expected, \
+                f"Expected {seconds}s to format as {expected}"
@@ -17,75 +17,135 @@ What we are NOT testing:
 The signal: "Given a CloudTrail event, does my logic correctly classify it?"
 """
 
+import copy
 import json
-import sys
-import os
+import logging
 import pytest
 from unittest.mock import patch, MagicMock
-import importlib.util
 
 
-# =============================================================================
-# Dynamic Import Setup
-# =============================================================================
-# Handle 'lambda' being a reserved keyword in Python by loading dynamically
-
-def load_handler_module():
-    """Dynamically load handler from lambda directory (reserved keyword workaround)."""
-    possible_paths = [
-        os.path.join(os.path.dirname(__file__), '..', 'src', 'simulator', 'handler.py'),
-        os.path.join(os.path.dirname(__file__), '..', 'lambda', 'simulator', 'handler.py'),
-    ]
-    
-    for handler_path in possible_paths:
-        handler_path = os.path.abspath(handler_path)
-        if os.path.exists(handler_path):
-            spec = importlib.util.spec_from_file_location("simulator_handler", handler_path)
-            module = importlib.util.module_from_spec(spec)
-            sys.modules["simulator_handler"] = module
-            spec.loader.exec_module(module)
-            return module
-    
-    raise FileNotFoundError(f"Handler not found in: {possible_paths}")
+@pytest.fixture(scope="class")
+def class_mocks():
+    """MagicMocks for the handler side effects, built once per test class."""
+    return {
+        'store_incident': MagicMock(),
+        'publish_alert': MagicMock(),
+        'emit_metric': MagicMock()
+    }
 
 
-# Load module at import time
-handler = load_handler_module()
+@pytest.fixture
+def mocks(handler, class_mocks):
+    """Replace the handler's store/alert/metric side effects with MagicMocks."""
+    # Patched per test so unmocked tests in the same class see the real functions
+    for mock in class_mocks.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    
+    with patch.multiple(handler, **class_mocks):
+        yield class_mocks
 
 
 # =============================================================================
 # Test Classes
 # =============================================================================
 
+# (event, whether is_cloudtrail_event should accept it)
+CLASSIFICATION_CASES = (
+    ({"detail-type": "AWS Console Sign In via CloudTrail", "detail": {"eventName": "ConsoleLogin"}}, True),
+    ({"scenario": "mfa_auth_failure", "user": "test-user"}, False),
+    ({"detail-type": "Something", "detail": "not a dict"}, False)
+)
+
+# Simulator events with the incident fields and detection_signal entries
+# each must produce
+SIMULATOR_CASES = (
+    (
+        {"scenario": "mfa_auth_failure", "user": "test-user-01", "source_ip": "192.0.2.100"},
+        {"user": "test-user-01", "source_ip": "192.0.2.100", "detection_source": "simulator"},
+        {}
+    ),
+    (
+        {"scenario": "rate_limiting", "user": "rate-limit-user", "metadata": {"failure_count": 7, "window_seconds": 45}},
+        {"severity": "HIGH", "auto_remediation": True, "cooldown_seconds": 300, "gsi_pk": "OPEN_RATE"},
+        {"failure_count": 7, "window_seconds": 45}
+    ),
+    (
+        {
+            "scenario": "policy_mismatch",
+            "user": "policy-test-user",
+            "metadata": {
+                "denied_action": "dynamodb:PutItem",
+                "resource": "arn:aws:dynamodb:us-east-1:123456789012:table/secrets"
+            }
+        },
+        {"user": "policy-test-user"},
+        {
+            "attempted_action": "dynamodb:PutItem",
+            "resource": "arn:aws:dynamodb:us-east-1:123456789012:table/secrets",
+            "event_name": "PutItem",
+            "event_source": "dynamodb.amazonaws.com"
+        }
+    )
+)
+
+# Expected incident_id prefix per simulator scenario
+SCENARIO_ID_PREFIXES = {
+    'mfa_auth_failure': 'MFA-AUTH-',
+    'rate_limiting': 'RATE-LIMIT-',
+    'policy_mismatch': 'POLICY-'
+}
+
+# Minimal successful ConsoleLogin; edge cases layer detail fields over it
+EDGE_BASE_EVENT = {
+    "detail-type": "AWS Console Sign In via CloudTrail",
+    "detail": {
+        "eventName": "ConsoleLogin",
+        "sourceIPAddress": "1.2.3.4",
+        "responseElements": {"ConsoleLogin": "Success"}
+    }
+}
+
+# (detail fields, expected status, expected stored user or None)
+EDGE_CASE_DETAILS = (
+    # No userName: still an incident, attributed to principalId
+    (
+        {
+            "additionalEventData": {"MFAUsed": "No"},
+            "userIdentity": {"type": "IAMUser", "principalId": "AIDA123456789"}
+        },
+        'created',
+        'AIDA123456789'
+    ),
+    # No additionalEventData: MFAUsed defaults to 'Yes', so no match
+    (
+        {"userIdentity": {"type": "IAMUser", "userName": "test-user"}},
+        'no_match',
+        None
+    )
+)
+
+
+# LOG_LEVEL values and the level the handler logger is set to
+LOG_LEVEL_CASES = (
+    ('WARNING', logging.WARNING),
+    ('warn', logging.WARNING),
+    ('debug', logging.DEBUG),
+    ('verbose', logging.INFO),
+    ('', logging.INFO)
+)
+
+
 class TestEventClassification:
     """Test the core event classification logic."""
     
-    def test_is_cloudtrail_event_with_valid_event(self):
-        """Verify CloudTrail event detection."""
-        event = {
-            "detail-type": "AWS Console Sign In via CloudTrail",
-            "detail": {"eventName": "ConsoleLogin"}
-        }
-        
-        assert handler.is_cloudtrail_event(event) is True
-    
-    def test_is_cloudtrail_event_with_simulator_event(self):
-        """Simulator events should not be classified as CloudTrail."""
-        event = {
-            "scenario": "mfa_auth_failure",
-            "user": "test-user"
-        }
-        
-        assert handler.is_cloudtrail_event(event) is False
-    
-    def test_is_cloudtrail_event_with_empty_detail(self):
-        """Events with non-dict detail should not match."""
-        event = {
-            "detail-type": "Something",
-            "detail": "not a dict"
-        }
-        
-        assert handler.is_cloudtrail_event(event) is False
+    @pytest.mark.parametrize(
+        "event, expected",
+        CLASSIFICATION_CASES,
+        ids=['cloudtrail_event', 'simulator_event', 'non_dict_detail']
+    )
+    def test_is_cloudtrail_event(self, handler, event, expected):
+        """CloudTrail events are detected; simulator events and non-dict details are not."""
+        assert handler.is_cloudtrail_event(event) is expected
 
 
 class TestMFAFailureDetection:
@@ -99,7 +159,10 @@ class TestMFAFailureDetection:
     
     def test_detects_successful_login_without_mfa(
         self, 
-        cloudtrail_console_login_success_no_mfa
+        handler,
+        response_body,
+        cloudtrail_console_login_success_no_mfa,
+        mocks
     ):
         """
         CRITICAL TEST: Successful login without MFA should trigger incident.
@@ -115,36 +178,35 @@ class TestMFAFailureDetection:
         - failure_type='mfa_not_enforced'
         - severity='HIGH' (more severe than failed login)
         """
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
-            
-            response = handler.lambda_handler(cloudtrail_console_login_success_no_mfa, None)
-            
-            # Verify response structure
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            
-            assert body['mode'] == 'detector'
-            assert body['status'] == 'created'
-            assert body['scenario'] == 'mfa_auth_failure'
-            assert body['source'] == 'cloudtrail'
-            assert 'incident_id' in body
-            assert body['incident_id'].startswith('MFA-AUTH-')
-            
-            # Verify incident was stored
-            mock_store.assert_called_once()
-            stored_incident = mock_store.call_args[0][0]
-            
-            assert stored_incident['user'] == 'finance-analyst-01'
-            assert stored_incident['source_ip'] == '203.0.113.42'
-            assert stored_incident['failure_type'] == 'mfa_not_enforced'
-            assert stored_incident['severity'] == 'HIGH'
-            assert stored_incident['detection_source'] == 'cloudtrail'
+        response = handler.lambda_handler(cloudtrail_console_login_success_no_mfa, None)
+        
+        # Verify response structure
+        assert response['statusCode'] == 200
+        body = response_body(response)
+        
+        assert body['mode'] == 'detector'
+        assert body['status'] == 'created'
+        assert body['scenario'] == 'mfa_auth_failure'
+        assert body['source'] == 'cloudtrail'
+        assert 'incident_id' in body
+        assert body['incident_id'].startswith('MFA-AUTH-')
+        
+        # Verify incident was stored
+        mocks['store_incident'].assert_called_once()
+        stored_incident = mocks['store_incident'].call_args.args[0]
+        
+        assert stored_incident['user'] == 'finance-analyst-01'
+        assert stored_incident['source_ip'] == '203.0.113.42'
+        assert stored_incident['failure_type'] == 'mfa_not_enforced'
+        assert stored_incident['severity'] == 'HIGH'
+        assert stored_incident['detection_source'] == 'cloudtrail'
     
     def test_detects_failed_login_without_mfa(
         self, 
-        cloudtrail_console_login_failed_no_mfa
+        handler,
+        response_body,
+        cloudtrail_console_login_failed_no_mfa,
+        mocks
     ):
         """
         Test: Failed login attempt without MFA should trigger incident.
@@ -160,48 +222,71 @@ class TestMFAFailureDetection:
         - Incident created with failure_type='authentication_failed'
         - severity='MEDIUM'
         """
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
-            
-            response = handler.lambda_handler(cloudtrail_console_login_failed_no_mfa, None)
-            
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            
-            assert body['status'] == 'created'
-            assert body['scenario'] == 'mfa_auth_failure'
-            
-            # Verify incident details
-            stored_incident = mock_store.call_args[0][0]
-            assert stored_incident['user'] == 'dev-engineer-02'
-            assert stored_incident['failure_type'] == 'authentication_failed'
-            assert stored_incident['severity'] == 'MEDIUM'
+        response = handler.lambda_handler(cloudtrail_console_login_failed_no_mfa, None)
+        
+        assert response['statusCode'] == 200
+        body = response_body(response)
+        
+        assert body['status'] == 'created'
+        assert body['scenario'] == 'mfa_auth_failure'
+        
+        # Verify incident details
+        stored_incident = mocks['store_incident'].call_args.args[0]
+        assert stored_incident['user'] == 'dev-engineer-02'
+        assert stored_incident['failure_type'] == 'authentication_failed'
+        assert stored_incident['severity'] == 'MEDIUM'
     
     def test_ignores_successful_login_with_mfa(
         self, 
-        cloudtrail_console_login_success_with_mfa
+        handler,
+        response_body,
+        cloudtrail_console_login_success_with_mfa,
+        mocks
     ):
         """
         Test: Successful login WITH MFA should NOT trigger incident.
         
         This is expected behavior - no action needed.
         """
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert') as mock_alert, \
-             patch.object(handler, 'emit_metric'):
+        response = handler.lambda_handler(cloudtrail_console_login_success_with_mfa, None)
+        
+        assert response['statusCode'] == 200
+        body = response_body(response)
+        
+        assert body['status'] == 'no_match'
+        assert body['event_name'] == 'ConsoleLogin'
+        
+        # Verify NO incident was stored
+        mocks['store_incident'].assert_not_called()
+        mocks['publish_alert'].assert_not_called()
+    
+    def test_unknown_failure_type_gets_generic_action(self, handler):
+        """Unrecognised failure types fall back to MEDIUM with the policy review action."""
+        incident = handler.create_mfa_auth_failure_incident(
+            'dev-engineer-02', '203.0.113.42', {}, failure_type='token_replayed',
+            now=1739890800, now_iso='2025-02-18T15:00:00+00:00'
+        )
+        
+        assert incident['failure_type'] == 'token_replayed'
+        assert incident['severity'] == 'MEDIUM'
+        assert incident['recommended_action'] == 'Review MFA enforcement policy for this user/role'
+        assert incident['description'].startswith('MFA authentication failure for user dev-engineer-02')
+    
+    def test_no_match_event_builds_no_aws_clients(
+        self,
+        handler,
+        response_body,
+        cloudtrail_console_login_success_with_mfa
+    ):
+        """Events that match no pattern return before any boto3 client is created."""
+        with patch.object(handler, 'get_dynamodb') as mock_get_dynamodb, \
+             patch.object(handler, 'get_sns') as mock_get_sns:
             
             response = handler.lambda_handler(cloudtrail_console_login_success_with_mfa, None)
             
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            
-            assert body['status'] == 'no_match'
-            assert body['event_name'] == 'ConsoleLogin'
-            
-            # Verify NO incident was stored
-            mock_store.assert_not_called()
-            mock_alert.assert_not_called()
+            assert response_body(response)['status'] == 'no_match'
+            mock_get_dynamodb.assert_not_called()
+            mock_get_sns.assert_not_called()
 
 
 class TestPolicyMismatchDetection:
@@ -214,7 +299,10 @@ class TestPolicyMismatchDetection:
     
     def test_detects_access_denied_with_mfa_session(
         self, 
-        cloudtrail_access_denied_with_mfa
+        handler,
+        response_body,
+        cloudtrail_access_denied_with_mfa,
+        mocks
     ):
         """
         Test: AccessDenied with mfaAuthenticated=true triggers policy_mismatch.
@@ -227,134 +315,112 @@ class TestPolicyMismatchDetection:
         
         This is the "user did everything right but policy is misconfigured" case.
         """
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
-            
-            response = handler.lambda_handler(cloudtrail_access_denied_with_mfa, None)
-            
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            
-            assert body['status'] == 'created'
-            assert body['scenario'] == 'policy_mismatch'
-            
-            # Verify incident details
-            stored_incident = mock_store.call_args[0][0]
-            assert stored_incident['user'] == 'finance-analyst-01'
-            assert stored_incident['scenario'] == 'policy_mismatch'
-            assert stored_incident['severity'] == 'MEDIUM'
-            assert 'GetObject' in stored_incident['description']
+        response = handler.lambda_handler(cloudtrail_access_denied_with_mfa, None)
+        
+        assert response['statusCode'] == 200
+        body = response_body(response)
+        
+        assert body['status'] == 'created'
+        assert body['scenario'] == 'policy_mismatch'
+        
+        # Verify incident details
+        stored_incident = mocks['store_incident'].call_args.args[0]
+        assert stored_incident['user'] == 'finance-analyst-01'
+        assert stored_incident['scenario'] == 'policy_mismatch'
+        assert stored_incident['severity'] == 'MEDIUM'
+        assert 'GetObject' in stored_incident['description']
+    
+    def test_stores_bounded_request_parameters(
+        self,
+        handler,
+        cloudtrail_access_denied_with_mfa,
+        mocks
+    ):
+        """Only scalar requestParameters are copied into detection_signal."""
+        event = {
+            **cloudtrail_access_denied_with_mfa,
+            'detail': {
+                **cloudtrail_access_denied_with_mfa['detail'],
+                'requestParameters': {
+                    'bucketName': 'sensitive-financial-data',
+                    'key': 'k' * 1000,
+                    'policy': {'Statement': [{'Effect': 'Deny'}]}
+                }
+            }
+        }
+        
+        handler.lambda_handler(event, None)
+        
+        params = mocks['store_incident'].call_args.args[0]['detection_signal']['request_parameters']
+        assert params['bucketName'] == 'sensitive-financial-data'
+        assert len(params['key']) == handler.EVENT_DATA_MAX_CHARS
+        assert 'policy' not in params
     
     def test_ignores_access_denied_without_mfa_session(
         self, 
-        cloudtrail_access_denied_without_mfa
+        handler,
+        response_body,
+        cloudtrail_access_denied_without_mfa,
+        mocks
     ):
         """
         Test: AccessDenied WITHOUT MFA session should NOT trigger policy_mismatch.
         
         This is expected behavior - user didn't have MFA, so denial is correct.
         """
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
-            
-            response = handler.lambda_handler(cloudtrail_access_denied_without_mfa, None)
-            
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            
-            # Should not match - not a policy mismatch, just expected denial
-            assert body['status'] == 'no_match'
-            mock_store.assert_not_called()
+        response = handler.lambda_handler(cloudtrail_access_denied_without_mfa, None)
+        
+        assert response['statusCode'] == 200
+        body = response_body(response)
+        
+        # Should not match - not a policy mismatch, just expected denial
+        assert body['status'] == 'no_match'
+        mocks['store_incident'].assert_not_called()
 
 
 class TestSimulatorMode:
     """Test simulator mode for generating synthetic incidents."""
     
-    def test_simulator_mfa_auth_failure(self):
-        """Test simulator generates mfa_auth_failure incidents."""
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
-            
-            event = {
-                "scenario": "mfa_auth_failure",
-                "user": "test-user-01",
-                "source_ip": "192.0.2.100"
-            }
-            
-            response = handler.lambda_handler(event, None)
-            
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            
-            assert body['mode'] == 'simulator'
-            assert body['scenario'] == 'mfa_auth_failure'
-            assert body['status'] == 'created'
-            
-            # Verify incident structure
-            stored_incident = mock_store.call_args[0][0]
-            assert stored_incident['user'] == 'test-user-01'
-            assert stored_incident['source_ip'] == '192.0.2.100'
-            assert stored_incident['detection_source'] == 'simulator'
-    
-    def test_simulator_rate_limiting(self):
-        """Test simulator generates rate_limiting incidents with correct metadata."""
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
-            
-            event = {
-                "scenario": "rate_limiting",
-                "user": "rate-limit-user",
-                "metadata": {
-                    "failure_count": 7,
-                    "window_seconds": 45
-                }
-            }
-            
-            response = handler.lambda_handler(event, None)
-            
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            
-            assert body['scenario'] == 'rate_limiting'
-            
-            stored_incident = mock_store.call_args[0][0]
-            assert stored_incident['severity'] == 'HIGH'
-            assert stored_incident['auto_remediation'] is True
-            assert stored_incident['cooldown_seconds'] == 300
-            assert stored_incident['detection_signal']['failure_count'] == 7
-            assert stored_incident['detection_signal']['window_seconds'] == 45
-    
-    def test_simulator_policy_mismatch(self):
-        """Test simulator generates policy_mismatch incidents."""
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
-            
-            event = {
-                "scenario": "policy_mismatch",
-                "user": "policy-test-user",
-                "metadata": {
-                    "denied_action": "dynamodb:PutItem",
-                    "resource": "arn:aws:dynamodb:us-east-1:123456789012:table/secrets"
-                }
-            }
-            
-            response = handler.lambda_handler(event, None)
-            
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            
-            assert body['scenario'] == 'policy_mismatch'
-            
-            stored_incident = mock_store.call_args[0][0]
-            assert stored_incident['detection_signal']['attempted_action'] == 'dynamodb:PutItem'
-            assert 'secrets' in stored_incident['detection_signal']['resource']
+    @pytest.mark.parametrize(
+        "event, expected_fields, expected_signal",
+        SIMULATOR_CASES,
+        ids=[event['scenario'] for event, _, _ in SIMULATOR_CASES]
+    )
+    def test_simulator_creates_incident(self, handler, response_body, mocks, event, expected_fields, expected_signal):
+        """Each scenario is created with its fields and detection signal."""
+        response = handler.lambda_handler(event, None)
+        
+        assert response['statusCode'] == 200
+        body = response_body(response)
+        
+        assert body['mode'] == 'simulator'
+        assert body['scenario'] == event['scenario']
+        assert body['status'] == 'created'
+        
+        stored_incident = mocks['store_incident'].call_args.args[0]
+        for field, value in expected_fields.items():
+            assert stored_incident[field] == value, field
+        for field, value in expected_signal.items():
+            assert stored_incident['detection_signal'][field] == value, field
+    
+    def test_simulator_rate_limiting_remediation_window(self, handler, mocks):
+        """rate_limiting incidents join the remediation index after their cooldown."""
+        handler.lambda_handler({"scenario": "rate_limiting", "user": "rate-limit-user"}, None)
+        
+        stored_incident = mocks['store_incident'].call_args.args[0]
+        assert stored_incident['remediation_ready_at'] == stored_incident['created_at'] + 300
+    
+    def test_simulator_policy_mismatch_bare_action(self, handler):
+        """A denied_action without a service prefix falls back to aws.amazonaws.com."""
+        incident = handler.simulate_policy_mismatch(
+            'policy-test-user', '10.0.0.1', {'denied_action': 'GetObject'},
+            1739890800, '2025-02-18T15:00:00+00:00'
+        )
+        
+        assert incident['detection_signal']['event_name'] == 'GetObject'
+        assert incident['detection_signal']['event_source'] == 'aws.amazonaws.com'
     
-    def test_simulator_unknown_scenario_returns_error(self):
+    def test_simulator_unknown_scenario_returns_error(self, handler, response_body):
         """Test that unknown scenarios return 400 error."""
         event = {
             "scenario": "unknown_scenario",
@@ -364,66 +430,331 @@ class TestSimulatorMode:
         response = handler.lambda_handler(event, None)
         
         assert response['statusCode'] == 400
-        body = json.loads(response['body'])
+        body = response_body(response)
         assert 'error' in body
         assert 'valid_scenarios' in body
+    
+    def test_warmup_ping_skips_aws_calls(self, handler, response_body):
+        """Keep-warm pings return without touching DynamoDB or SNS."""
+        with patch.object(handler, 'get_dynamodb') as mock_get_dynamodb, \
+             patch.object(handler, 'get_sns') as mock_get_sns:
+            
+            response = handler.lambda_handler({"scenario": "ping"}, None)
+            
+            assert response['statusCode'] == 200
+            assert response_body(response)['mode'] == 'warmup'
+            mock_get_dynamodb.assert_not_called()
+            mock_get_sns.assert_not_called()
 
 
 class TestIncidentStructure:
     """Verify incident objects have required fields for downstream processing."""
     
-    def test_incident_has_required_fields(self):
+    def test_incident_has_required_fields(self, handler, mocks):
         """All incidents must have these fields for DynamoDB and alerting."""
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
+        event = {
+            "scenario": "mfa_auth_failure",
+            "user": "field-test-user"
+        }
+        
+        handler.lambda_handler(event, None)
+        
+        incident = mocks['store_incident'].call_args.args[0]
+        
+        # Required fields for DynamoDB
+        assert 'incident_id' in incident
+        assert 'scenario' in incident
+        assert 'severity' in incident
+        assert 'status' in incident
+        assert 'timestamp' in incident
+        assert 'created_at' in incident
+        assert 'user' in incident
+        assert 'ttl' in incident  # For DynamoDB TTL
+        
+        # Required fields for alerting
+        assert 'description' in incident
+        assert 'recommended_action' in incident
+        assert 'detection_source' in incident
+        
+        # Required for CloudWatch metrics
+        assert 'environment' in incident
+    
+    def test_incident_id_format(self, handler, mocks):
+        """Incident IDs should follow expected format for each scenario."""
+        for scenario in SCENARIO_ID_PREFIXES:
+            handler.lambda_handler({"scenario": scenario, "user": "test"}, None)
+        
+        stored = [c.args[0] for c in mocks['store_incident'].call_args_list]
+        
+        assert len(stored) == len(SCENARIO_ID_PREFIXES)
+        
+        # IDs are <prefix><26-character ULID>, stored in scenario order
+        for incident, prefix in zip(stored, SCENARIO_ID_PREFIXES.values()):
+            incident_id = incident['incident_id']
+            assert incident_id.startswith(prefix)
             
-            event = {
-                "scenario": "mfa_auth_failure",
-                "user": "field-test-user"
-            }
+            ulid = incident_id[len(prefix):]
+            assert len(ulid) == 26
+            assert set(ulid) <= set(handler.ULID_ALPHABET)
+    
+    def test_incident_ids_sort_by_creation_time(self, handler):
+        """Incident IDs are ULIDs whose order follows created_at."""
+        earlier = handler.new_incident_id('RATE-LIMIT', 1700000000000)
+        later = handler.new_incident_id('RATE-LIMIT', 1700000000001)
+        
+        suffix = earlier[len('RATE-LIMIT-'):]
+        assert len(suffix) == 26
+        assert suffix[:10] == '01HF7YAT00'  # 1700000000000 ms, Crockford base32
+        assert set(suffix) <= set(handler.ULID_ALPHABET)
+        assert earlier < later
+    
+    def test_incident_ids_minted_in_sequence_sort_in_sequence(self, handler):
+        """IDs sharing a millisecond, or minted back to back, keep their order."""
+        same_millisecond = [handler.new_incident_id('MFA-AUTH', 1700000000000) for _ in range(200)]
+        back_to_back = [handler.new_incident_id('MFA-AUTH') for _ in range(200)]
+        
+        assert sorted(same_millisecond) == same_millisecond
+        assert sorted(back_to_back) == back_to_back
+        assert len(set(same_millisecond + back_to_back)) == 400
+
+
+class TestMetricEmission:
+    """Verify the Embedded Metric Format line consumed by the dashboard."""
+    
+    def test_emit_metric_writes_emf_document(self, handler, capsys):
+        """IncidentCount is emitted with every dimension set the dashboard queries."""
+        incident = {
+            'incident_id': 'MFA-AUTH-EMF00001',
+            'scenario': 'mfa_auth_failure',
+            'severity': 'HIGH',
+            'detection_source': 'cloudtrail'
+        }
+        
+        handler.emit_metric(incident)
+        
+        document = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+        metrics = document['_aws']['CloudWatchMetrics'][0]
+        
+        assert metrics['Namespace'] == 'MFAIncidentSimulator'
+        assert metrics['Metrics'] == [{'Name': 'IncidentCount', 'Unit': 'Count'}]
+        assert ['Scenario', 'Environment'] in metrics['Dimensions']
+        assert ['Severity', 'Environment'] in metrics['Dimensions']
+        assert ['Environment'] in metrics['Dimensions']
+        assert document['IncidentCount'] == 1
+        assert document['Scenario'] == 'mfa_auth_failure'
+        assert document['Source'] == 'cloudtrail'
+    
+    def test_emit_metrics_aggregates_per_dimension_set(self, handler, capsys):
+        """Incidents sharing dimensions are summed into one EMF document."""
+        incidents = [
+            {'incident_id': f'RATE-LIMIT-EMF{i:05d}', 'scenario': 'rate_limiting',
+             'severity': 'HIGH', 'detection_source': 'simulator'}
+            for i in range(3)
+        ] + [
+            {'incident_id': 'POLICY-EMF00001', 'scenario': 'policy_mismatch',
+             'severity': 'MEDIUM', 'detection_source': 'cloudtrail'}
+        ]
+        
+        handler.emit_metrics(incidents)
+        
+        documents = [
+            json.loads(line) for line in capsys.readouterr().out.splitlines()
+            if line.startswith('{')
+        ]
+        counts = {document['Scenario']: document['IncidentCount'] for document in documents}
+        
+        assert len(documents) == 2
+        assert counts == {'rate_limiting': 3, 'policy_mismatch': 1}
+
+
+class TestItemSerialization:
+    """Verify the hand-written DynamoDB serializer used by store_incidents."""
+    
+    def test_matches_boto3_type_serializer(self, handler):
+        """Simulated incidents serialize exactly as the resource layer would."""
+        from boto3.dynamodb.types import TypeSerializer
+        
+        incident = handler.simulate_rate_limiting(
+            'serializer-user', '10.0.0.1', {'failure_count': 7, 'tags': ['a', 'b'], 'note': None},
+            1739890800, '2025-02-18T15:00:00+00:00'
+        )
+        serializer = TypeSerializer()
+        
+        expected = {key: serializer.serialize(value) for key, value in incident.items()}
+        assert handler.serialize_item(incident) == expected
+    
+    def test_bool_is_not_serialized_as_number(self, handler):
+        """bool subclasses int, so it must be checked first."""
+        assert handler.to_dynamodb(True) == {'BOOL': True}
+        assert handler.to_dynamodb(1) == {'N': '1'}
+    
+    def test_rejects_float(self, handler):
+        """Floats are rejected, matching the resource layer."""
+        with pytest.raises(TypeError):
+            handler.to_dynamodb(1.5)
+    
+    def test_serialization_failure_is_logged_with_incident_id(self, handler, caplog):
+        """A float in an incident is logged with its incident_id before DynamoDB is called."""
+        incident = {'incident_id': 'MFA-AUTH-FLOAT0001', 'score': 0.5}
+        
+        with patch.object(handler, 'get_dynamodb') as mock_get_dynamodb, \
+             caplog.at_level('ERROR'):
             
-            handler.lambda_handler(event, None)
+            with pytest.raises(TypeError, match='MFA-AUTH-FLOAT0001'):
+                handler.store_incidents([incident])
+        
+        mock_get_dynamodb.assert_not_called()
+        assert any('MFA-AUTH-FLOAT0001' in record.getMessage() for record in caplog.records)
+
+
+class TestBatchedWrites:
+    """Verify BatchWriteItem chunking and UnprocessedItems handling."""
+    
+    def make_incidents(self, handler, count):
+        """Build `count` simulated rate_limiting incidents."""
+        return [
+            handler.simulate_rate_limiting(f'write-user-{i:03d}', '10.0.0.1', {}, 1739890800, '2025-02-18T15:00:00+00:00')
+            for i in range(count)
+        ]
+    
+    def test_writes_are_chunked_per_batch_limit(self, handler):
+        """Incidents are written 25 puts per BatchWriteItem call."""
+        with patch.object(handler, 'get_dynamodb') as mock_get_dynamodb:
+            mock_batch = mock_get_dynamodb.return_value.batch_write_item
+            mock_batch.return_value = {'UnprocessedItems': {}}
             
-            incident = mock_store.call_args[0][0]
+            handler.store_incidents(self.make_incidents(handler, 60))
+        
+        chunk_sizes = sorted(
+            len(c.kwargs['RequestItems'][handler.TABLE_NAME])
+            for c in mock_batch.call_args_list
+        )
+        assert chunk_sizes == [10, 25, 25]
+    
+    def test_unprocessed_items_are_retried_with_backoff(self, handler):
+        """UnprocessedItems are resubmitted after an exponential delay."""
+        with patch.object(handler, 'get_dynamodb') as mock_get_dynamodb, \
+             patch.object(handler.time, 'sleep') as mock_sleep:
+            mock_batch = mock_get_dynamodb.return_value.batch_write_item
             
-            # Required fields for DynamoDB
-            assert 'incident_id' in incident
-            assert 'scenario' in incident
-            assert 'severity' in incident
-            assert 'status' in incident
-            assert 'timestamp' in incident
-            assert 'created_at' in incident
-            assert 'user' in incident
-            assert 'ttl' in incident  # For DynamoDB TTL
+            def leave_one_unprocessed(RequestItems):
+                items = RequestItems[handler.TABLE_NAME]
+                if mock_batch.call_count < 3:
+                    return {'UnprocessedItems': {handler.TABLE_NAME: items[:1]}}
+                return {'UnprocessedItems': {}}
+            mock_batch.side_effect = leave_one_unprocessed
             
-            # Required fields for alerting
-            assert 'description' in incident
-            assert 'recommended_action' in incident
-            assert 'detection_source' in incident
+            handler.store_incidents(self.make_incidents(handler, 5))
+        
+        assert mock_batch.call_count == 3
+        assert len(mock_batch.call_args_list[-1].kwargs['RequestItems'][handler.TABLE_NAME]) == 1
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        assert delays == [handler.BATCH_WRITE_BASE_DELAY_SECONDS, handler.BATCH_WRITE_BASE_DELAY_SECONDS * 2]
+    
+    def test_raises_when_items_stay_unprocessed(self, handler):
+        """Persistent UnprocessedItems surface as an error, not silent loss."""
+        with patch.object(handler, 'get_dynamodb') as mock_get_dynamodb, \
+             patch.object(handler.time, 'sleep'):
+            mock_batch = mock_get_dynamodb.return_value.batch_write_item
+            mock_batch.side_effect = lambda RequestItems: {'UnprocessedItems': RequestItems}
             
-            # Required for CloudWatch metrics
-            assert 'environment' in incident
+            with pytest.raises(RuntimeError):
+                handler.store_incidents(self.make_incidents(handler, 2))
+        
+        assert mock_batch.call_count == handler.BATCH_WRITE_MAX_ATTEMPTS
+
+
+class TestAlertPublishing:
+    """Verify SNS alerts are sent with PublishBatch."""
     
-    def test_incident_id_format(self):
-        """Incident IDs should follow expected format for each scenario."""
-        scenarios = [
-            ('mfa_auth_failure', 'MFA-AUTH-'),
-            ('rate_limiting', 'RATE-LIMIT-'),
-            ('policy_mismatch', 'POLICY-')
+    def test_alerts_are_chunked_per_batch_limit(self, handler):
+        """Alerts are published 10 entries per PublishBatch call."""
+        incidents = [
+            handler.simulate_rate_limiting(f'alert-user-{i:02d}', '10.0.0.1', {}, 1739890800, '2025-02-18T15:00:00+00:00')
+            for i in range(25)
         ]
         
-        for scenario, prefix in scenarios:
-            with patch.object(handler, 'store_incident') as mock_store, \
-                 patch.object(handler, 'publish_alert'), \
-                 patch.object(handler, 'emit_metric'):
-                
-                event = {"scenario": scenario, "user": "test"}
-                handler.lambda_handler(event, None)
-                
-                incident = mock_store.call_args[0][0]
-                assert incident['incident_id'].startswith(prefix), \
-                    f"Expected {scenario} incident_id to start with {prefix}"
+        with patch.object(handler, 'get_sns') as mock_get_sns:
+            mock_sns = mock_get_sns.return_value
+            mock_sns.publish_batch.return_value = {'Successful': [], 'Failed': []}
+            
+            handler.publish_alerts(incidents)
+        
+        chunk_sizes = sorted(
+            len(c.kwargs['PublishBatchRequestEntries'])
+            for c in mock_sns.publish_batch.call_args_list
+        )
+        assert chunk_sizes == [5, 10, 10]
+        
+        entries = [
+            entry
+            for c in mock_sns.publish_batch.call_args_list
+            for entry in c.kwargs['PublishBatchRequestEntries']
+        ]
+        assert {entry['Id'] for entry in entries} == {incident['incident_id'] for incident in incidents}
+        assert entries[0]['Subject'] == '[HIGH] MFA Incident: rate_limiting'
+    
+    def test_lower_severity_batch_is_sent_as_digest(self, handler):
+        """HIGH incidents are alerted individually; the rest share one digest."""
+        high = [
+            handler.simulate_rate_limiting(f'high-user-{i}', '10.0.0.1', {}, 1739890800, '2025-02-18T15:00:00+00:00')
+            for i in range(3)
+        ]
+        medium = [
+            handler.simulate_mfa_auth_failure(f'medium-user-{i}', '10.0.0.2', {}, 1739890800, '2025-02-18T15:00:00+00:00')
+            for i in range(12)
+        ]
+        
+        with patch.object(handler, 'get_sns') as mock_get_sns:
+            mock_sns = mock_get_sns.return_value
+            mock_sns.publish_batch.return_value = {'Successful': [], 'Failed': []}
+            
+            handler.publish_alerts(high + medium)
+        
+        entries = mock_sns.publish_batch.call_args.kwargs['PublishBatchRequestEntries']
+        assert [entry['Id'] for entry in entries] == [incident['incident_id'] for incident in high]
+        
+        mock_sns.publish.assert_called_once()
+        digest_call = mock_sns.publish.call_args.kwargs
+        assert digest_call['Subject'] == '[DIGEST] 12 MFA Incidents'
+        digest = json.loads(digest_call['Message'])['digest']
+        assert [item['incident_id'] for item in digest] == [incident['incident_id'] for incident in medium]
+    
+    def test_single_lower_severity_incident_is_alerted_individually(self, handler):
+        """A lone MEDIUM incident keeps its full alert rather than a digest of one."""
+        incident = handler.simulate_mfa_auth_failure('solo-user', '10.0.0.2', {}, 1739890800, '2025-02-18T15:00:00+00:00')
+        
+        with patch.object(handler, 'get_sns') as mock_get_sns:
+            mock_sns = mock_get_sns.return_value
+            mock_sns.publish_batch.return_value = {'Successful': [], 'Failed': []}
+            
+            handler.publish_alert(incident)
+        
+        mock_sns.publish.assert_not_called()
+        entries = mock_sns.publish_batch.call_args.kwargs['PublishBatchRequestEntries']
+        assert entries[0]['Subject'] == '[MEDIUM] MFA Incident: mfa_auth_failure'
+
+
+class TestMessageSerialization:
+    """SNS message bodies are indented JSON for email readability."""
+    
+    def test_message_encoder_indents(self, handler):
+        """The shared encoder matches json.dumps(indent=2)."""
+        message = {'incident_id': 'MFA-AUTH-TEST0001', 'severity': 'HIGH'}
+        
+        serialized = handler.MESSAGE_ENCODER.encode(message)
+        
+        assert serialized == json.dumps(message, indent=2)
+        assert json.loads(serialized) == message
+        assert '\n  "incident_id"' in serialized
+
+
+class TestLogLevel:
+    """LOG_LEVEL values that logging rejects must not fail the cold start."""
+    
+    @pytest.mark.parametrize("name,expected", LOG_LEVEL_CASES)
+    def test_resolve_log_level(self, handler, name, expected):
+        assert handler.resolve_log_level(name) == expected
 
 
 class TestBurstDetection:
@@ -437,7 +768,10 @@ class TestBurstDetection:
     
     def test_each_failure_in_burst_creates_incident(
         self, 
-        cloudtrail_burst_5_failures_60s
+        handler,
+        response_body,
+        burst_event,
+        mocks
     ):
         """
         Each failed login in a burst should create an individual incident.
@@ -446,99 +780,229 @@ class TestBurstDetection:
         not in the Lambda handler. The handler creates incidents for
         each event, which are then correlated in post-hoc analysis.
         """
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
-            
-            incidents_created = 0
-            
-            for event in cloudtrail_burst_5_failures_60s:
-                response = handler.lambda_handler(event, None)
-                body = json.loads(response['body'])
-                
-                if body.get('status') == 'created':
-                    incidents_created += 1
-            
-            # All 5 failures should create incidents
-            assert incidents_created == 5
-            assert mock_store.call_count == 5
-
-
-class TestEdgeCases:
-    """Test edge cases and boundary conditions."""
+        # burst_event is parametrized over the burst fixture in conftest
+        response = handler.lambda_handler(burst_event, None)
+        body = response_body(response)
+        
+        assert body['status'] == 'created'
+        mocks['store_incident'].assert_called_once()
+        assert mocks['store_incident'].call_args.args[0]['user'] == 'brute-force-target'
     
-    def test_handles_missing_username(self):
-        """Handler should gracefully handle events with missing userName."""
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
-            
-            event = {
-                "detail-type": "AWS Console Sign In via CloudTrail",
-                "detail": {
-                    "eventName": "ConsoleLogin",
-                    "sourceIPAddress": "1.2.3.4",
-                    "responseElements": {"ConsoleLogin": "Success"},
-                    "additionalEventData": {"MFAUsed": "No"},
-                    "userIdentity": {
-                        "type": "IAMUser",
-                        "principalId": "AIDA123456789"
-                        # Note: no userName field
-                    }
-                }
-            }
+    def test_sqs_batch_is_flushed_once(self, handler, response_body, cloudtrail_burst_5_failures_60s):
+        """A batch of SQS records is stored, published and counted in one call each."""
+        event = {
+            "Records": [
+                {"messageId": f"msg-{i}", "body": json.dumps(burst_event)}
+                for i, burst_event in enumerate(cloudtrail_burst_5_failures_60s)
+            ] + [
+                {"messageId": "msg-ignored", "body": json.dumps({"scenario": "mfa_auth_failure"})}
+            ]
+        }
+        
+        with patch.object(handler, 'store_incidents') as mock_store, \
+             patch.object(handler, 'publish_alerts') as mock_alerts, \
+             patch.object(handler, 'emit_metrics') as mock_metrics:
             
             response = handler.lambda_handler(event, None)
             
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            
-            # Should still create incident using principalId as fallback
-            assert body['status'] == 'created'
-            
-            incident = mock_store.call_args[0][0]
-            assert incident['user'] == 'AIDA123456789'  # Falls back to principalId
-    
-    def test_handles_empty_additional_event_data(self):
-        """Handler should handle missing additionalEventData gracefully."""
-        with patch.object(handler, 'store_incident') as mock_store, \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
+            body = response_body(response)
+            assert body['status'] == 'batch_processed'
+            assert body['records'] == 6
+            assert len(body['incident_ids']) == 5
             
-            event = {
-                "detail-type": "AWS Console Sign In via CloudTrail",
-                "detail": {
-                    "eventName": "ConsoleLogin",
-                    "sourceIPAddress": "1.2.3.4",
-                    "responseElements": {"ConsoleLogin": "Success"},
-                    # Note: no additionalEventData
-                    "userIdentity": {
-                        "type": "IAMUser",
-                        "userName": "test-user"
-                    }
-                }
-            }
+            mock_store.assert_called_once()
+            stored = mock_store.call_args.args[0]
+            assert [incident['user'] for incident in stored] == ['brute-force-target'] * 5
+            mock_alerts.assert_called_once_with(stored)
+            mock_metrics.assert_called_once_with(stored)
+    
+    def test_sqs_batch_logs_single_summary_line(self, handler, response_body, cloudtrail_burst_5_failures_60s, caplog):
+        """A batch logs one structured INFO line, not one per record."""
+        event = {
+            "Records": [
+                {"messageId": f"msg-{i}", "body": json.dumps(burst_event)}
+                for i, burst_event in enumerate(cloudtrail_burst_5_failures_60s)
+            ]
+        }
+        
+        with patch.object(handler, 'store_incidents'), \
+             patch.object(handler, 'publish_alerts'), \
+             patch.object(handler, 'emit_metrics'), \
+             caplog.at_level('INFO'):
             
             response = handler.lambda_handler(event, None)
+        
+        info_lines = [record.getMessage() for record in caplog.records if record.levelname == 'INFO']
+        assert len(info_lines) == 1
+        summary = json.loads(info_lines[0])
+        assert summary['records'] == 5
+        assert summary['incident_ids'] == response_body(response)['incident_ids']
+    
+    def test_sqs_batch_skips_summary_below_info(self, handler, cloudtrail_burst_5_failures_60s, caplog):
+        """At WARNING (prod) the summary line is not built at all."""
+        event = {
+            "Records": [
+                {"messageId": f"msg-{i}", "body": json.dumps(burst_event)}
+                for i, burst_event in enumerate(cloudtrail_burst_5_failures_60s)
+            ]
+        }
+        
+        with patch.object(handler, 'store_incidents'), \
+             patch.object(handler, 'publish_alerts'), \
+             patch.object(handler, 'emit_metrics'), \
+             patch.object(handler.logger, 'info') as mock_info, \
+             caplog.at_level('WARNING'):
             
-            # Should not crash, but should not match (MFAUsed defaults to 'Yes')
-            assert response['statusCode'] == 200
-            body = json.loads(response['body'])
-            assert body['status'] == 'no_match'
+            handler.lambda_handler(event, None)
+        
+        mock_info.assert_not_called()
     
-    def test_handles_empty_event(self):
-        """Handler should handle empty events gracefully."""
-        with patch.object(handler, 'store_incident'), \
-             patch.object(handler, 'publish_alert'), \
-             patch.object(handler, 'emit_metric'):
+    def test_sqs_batch_reports_malformed_records_individually(
+        self,
+        handler,
+        response_body,
+        cloudtrail_burst_5_failures_60s
+    ):
+        """Bad bodies are returned as batchItemFailures; the good records still go through."""
+        event = {
+            "Records": [
+                {"messageId": "msg-good", "body": json.dumps(cloudtrail_burst_5_failures_60s[0])},
+                {"messageId": "msg-not-json", "body": "not json"},
+                {"messageId": "msg-not-object", "body": "[]"}
+            ]
+        }
+        
+        with patch.object(handler, 'store_incidents') as mock_store, \
+             patch.object(handler, 'publish_alerts') as mock_alerts, \
+             patch.object(handler, 'emit_metrics'):
             
-            event = {}
+            response = handler.lambda_handler(event, None)
+        
+        assert response['batchItemFailures'] == [
+            {'itemIdentifier': 'msg-not-json'},
+            {'itemIdentifier': 'msg-not-object'}
+        ]
+        assert len(response_body(response)['incident_ids']) == 1
+        assert len(mock_store.call_args.args[0]) == 1
+        mock_alerts.assert_called_once()
+    
+    def test_sqs_batch_store_failure_retries_records_without_alerting(
+        self,
+        handler,
+        cloudtrail_burst_5_failures_60s
+    ):
+        """A failed write retries every incident record and sends no alerts or metrics."""
+        event = {
+            "Records": [
+                {"messageId": f"msg-{i}", "body": json.dumps(burst_event)}
+                for i, burst_event in enumerate(cloudtrail_burst_5_failures_60s)
+            ]
+        }
+        
+        with patch.object(handler, 'store_incidents', side_effect=RuntimeError('unprocessed')), \
+             patch.object(handler, 'publish_alerts') as mock_alerts, \
+             patch.object(handler, 'emit_metrics') as mock_metrics:
             
-            # Should treat as simulator mode with defaults
             response = handler.lambda_handler(event, None)
+        
+        assert response['batchItemFailures'] == [
+            {'itemIdentifier': f'msg-{i}'} for i in range(len(cloudtrail_burst_5_failures_60s))
+        ]
+        mock_alerts.assert_not_called()
+        mock_metrics.assert_not_called()
+    
+    def test_redelivered_event_keeps_its_incident_id(
+        self,
+        handler,
+        response_body,
+        cloudtrail_burst_5_failures_60s
+    ):
+        """The same CloudTrail event maps to one incident across and within deliveries."""
+        burst_event = cloudtrail_burst_5_failures_60s[0]
+        event = {
+            "Records": [
+                {"messageId": "msg-first", "body": json.dumps(burst_event)},
+                {"messageId": "msg-duplicate", "body": json.dumps(burst_event)}
+            ]
+        }
+        
+        with patch.object(handler, 'store_incidents') as mock_store, \
+             patch.object(handler, 'publish_alerts') as mock_alerts, \
+             patch.object(handler, 'emit_metrics'):
             
-            # Default scenario is mfa_auth_failure, so it should work
-            assert response['statusCode'] in [200, 400]
+            first = response_body(handler.lambda_handler(event, None))
+            redelivered = response_body(handler.lambda_handler(event, None))
+        
+        assert len(first['incident_ids']) == 1
+        assert first['incident_ids'] == redelivered['incident_ids']
+        assert len(mock_alerts.call_args.args[0]) == 1
+        
+        # ULID timestamp is the CloudTrail eventTime, not the delivery time
+        assert first['incident_ids'][0] == handler.cloudtrail_incident_id('MFA-AUTH', burst_event['detail'])
+
+
+class TestEdgeCases:
+    """Test edge cases and boundary conditions."""
+    
+    def test_detection_does_not_mutate_shared_event(
+        self,
+        handler,
+        cloudtrail_access_denied_with_mfa,
+        mocks
+    ):
+        """Session-scoped event fixtures must come back unchanged after detection."""
+        snapshot = copy.deepcopy(cloudtrail_access_denied_with_mfa)
+        
+        handler.lambda_handler(cloudtrail_access_denied_with_mfa, None)
+        
+        assert cloudtrail_access_denied_with_mfa == snapshot
+    
+    def test_mutating_incident_does_not_leak_into_next(self, handler):
+        """Nested detection_signal values are not shared with SCENARIO_SPECS."""
+        first = handler.build_incident('mfa_auth_failure', 'user-a', '192.0.2.1', {}, 0, '')
+        first['detection_signal']['additional_event_data']['MFAUsed'] = 'Mutated'
+        
+        second = handler.build_incident('mfa_auth_failure', 'user-b', '192.0.2.1', {}, 0, '')
+        
+        assert second['detection_signal']['additional_event_data']['MFAUsed'] == 'No'
+        assert handler.SCENARIO_SPECS['mfa_auth_failure']['detection_signal']['additional_event_data']['MFAUsed'] == 'No'
+    
+    @pytest.mark.parametrize(
+        "detail_override, expected_status, expected_user",
+        EDGE_CASE_DETAILS,
+        ids=['missing_username', 'missing_additional_event_data']
+    )
+    def test_handles_partial_console_login(
+        self,
+        handler,
+        response_body,
+        mocks,
+        detail_override,
+        expected_status,
+        expected_user
+    ):
+        """Handler should gracefully handle ConsoleLogin events with missing fields."""
+        event = {**EDGE_BASE_EVENT, "detail": {**EDGE_BASE_EVENT["detail"], **detail_override}}
+        
+        response = handler.lambda_handler(event, None)
+        
+        assert response['statusCode'] == 200
+        body = response_body(response)
+        assert body['status'] == expected_status
+        
+        if expected_user is not None:
+            incident = mocks['store_incident'].call_args.args[0]
+            assert incident['user'] == expected_user
+    
+    def test_handles_empty_event(self, handler, mocks):
+        """Handler should handle empty events gracefully."""
+        event = {}
+        
+        # Should treat as simulator mode with defaults
+        response = handler.lambda_handler(event, None)
+        
+        # Default scenario is mfa_auth_failure, so it should work
+        assert response['statusCode'] in [200, 400]
 
 
 class TestIntegration:
@@ -547,7 +1011,7 @@ class TestIntegration:
     These test the full flow including AWS service interactions.
     """
     
-    def test_full_flow_with_mocked_aws(self, mock_all_aws):
+    def test_full_flow_with_mocked_aws(self, handler, response_body, mock_all_aws):
         """
         Test complete incident flow with mocked AWS services.
         
@@ -568,7 +1032,7 @@ class TestIntegration:
         response = handler.lambda_handler(event, None)
         
         assert response['statusCode'] == 200
-        body = json.loads(response['body'])
+        body = response_body(response)
         
         assert body['status'] == 'created'
         incident_id = body['incident_id']
@@ -581,3 +1045,17 @@ class TestIntegration:
         assert item['Item']['user'] == 'integration-test-user'
         assert item['Item']['scenario'] == 'rate_limiting'
 
+    
+    def test_store_incidents_batches_writes(self, handler, mock_all_aws):
+        """Multiple incidents are written through one batch writer."""
+        incidents = [
+            handler.simulate_rate_limiting(f'batch-user-{i:02d}', '10.0.0.1', {}, 1739890800, '2025-02-18T15:00:00+00:00')
+            for i in range(30)
+        ]
+        
+        handler.store_incidents(incidents)
+        
+        table = mock_all_aws['table']
+        for incident in incidents:
+            item = table.get_item(Key={'incident_id': incident['incident_id']})
+            assert item['Item']['user'] == incident['user']